@@ -1,8 +1,14 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import matplotlib.pyplot as plt
-import seaborn as sns
+from dataset import load_data
+from filters import current_filter_key, sidebar_filters
+from fragments import chart_fragment
+from covariance import filtered_correlation
+from density import draw_violin_plot, violin_densities
+from sketch import box_sketches, draw_box_plot
+from figures import FigureBatch
+from scatter import SCATTER_COLUMNS, density_figure, density_grid, draw_scatter_plot, scatter_layer
+from export import EXPORT_FORMATS, download_button, export_status
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -11,12 +17,6 @@ st.set_page_config(page_title="Motorbike Accident Insights Dashboard", page_icon
 
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
-    df = pd.read_csv(url)
-    return df
-
 df = load_data()
 
 
@@ -70,93 +70,10 @@ with st.sidebar:
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        severity = st.multiselect(
-            "Accident Severity",
-            options=sorted(df["Accident_Severity"].dropna().unique()),
-            default=sorted(df["Accident_Severity"].dropna().unique())
-        )
-
-        weather = st.multiselect(
-            "Weather Condition",
-            options=sorted(df["Weather"].dropna().unique()),
-            default=sorted(df["Weather"].dropna().unique())
-        )
-
-        time_of_day = st.multiselect(
-            "Time of Day",
-            options=sorted(df["Time_of_Day"].dropna().unique()),
-            default=sorted(df["Time_of_Day"].dropna().unique())
-        )
-
-        road_type = st.multiselect(
-            "Road Type",
-            options=sorted(df["Road_Type"].dropna().unique()),
-            default=sorted(df["Road_Type"].dropna().unique())
-        )
-
-        # --- Optional Filters ---
-        if "Biker_Alcohol" in df.columns:
-            alcohol = st.multiselect(
-                "Biker Alcohol Consumption",
-                options=sorted(df["Biker_Alcohol"].dropna().unique()),
-                default=sorted(df["Biker_Alcohol"].dropna().unique())
-            )
-        else:
-            alcohol = []
-
-        if "Traffic_Density" in df.columns:
-            traffic = st.multiselect(
-                "Traffic Density",
-                options=sorted(df["Traffic_Density"].dropna().unique()),
-                default=sorted(df["Traffic_Density"].dropna().unique())
-            )
-        else:
-            traffic = []
-
-        if "Valid_Driving_License" in df.columns:
-            license_status = st.multiselect(
-                "Valid Driving License",
-                options=sorted(df["Valid_Driving_License"].dropna().unique()),
-                default=sorted(df["Valid_Driving_License"].dropna().unique())
-            )
-        else:
-            license_status = []
-
-        # --- Numeric Filter: Biker Age ---
-        if "Biker_Age" in df.columns:
-            min_age, max_age = st.slider(
-                "Filter by Biker Age",
-                int(df["Biker_Age"].min()),
-                int(df["Biker_Age"].max()),
-                (int(df["Biker_Age"].min()), int(df["Biker_Age"].max()))
-            )
-        else:
-            min_age, max_age = None, None
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        if severity:
-            filtered_df = filtered_df[filtered_df["Accident_Severity"].isin(severity)]
-        if weather:
-            filtered_df = filtered_df[filtered_df["Weather"].isin(weather)]
-        if time_of_day:
-            filtered_df = filtered_df[filtered_df["Time_of_Day"].isin(time_of_day)]
-        if road_type:
-            filtered_df = filtered_df[filtered_df["Road_Type"].isin(road_type)]
-        if alcohol:
-            filtered_df = filtered_df[filtered_df["Biker_Alcohol"].isin(alcohol)]
-        if traffic:
-            filtered_df = filtered_df[filtered_df["Traffic_Density"].isin(traffic)]
-        if license_status:
-            filtered_df = filtered_df[filtered_df["Valid_Driving_License"].isin(license_status)]
-        if min_age is not None:
-            filtered_df = filtered_df[
-                (filtered_df["Biker_Age"] >= min_age) & (filtered_df["Biker_Age"] <= max_age)
-            ]
+        filtered_df = sidebar_filters(df)
 
     # --- Reset and Download Buttons ---
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
@@ -165,12 +82,8 @@ with st.sidebar:
             st.rerun()
 
     with col2:
-        st.download_button(
-            label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
-            file_name="motor_accident_data.csv",
-            mime="text/csv"
-        )
+        download_button(current_filter_key(), export_format)
+    export_status()
     st.markdown("---")
 
 # ===== THEME TOGGLE =====
@@ -199,10 +112,16 @@ st.header("Advanced Statistical Visualizations")
 st.markdown("Explore deeper numerical relationships using box, violin, and scatter plots.")
 
 # Summary box
-corr_pair = df.corr(numeric_only=True).abs().unstack().sort_values(ascending=False)
-top_corr = corr_pair[corr_pair < 1].head(1)
-feature_a, feature_b = top_corr.index[0]
-value = top_corr.values[0]
+# Derived from the cached per-filter correlation matrix, so it follows the filters.
+@chart_fragment("strongest_correlation")
+def strongest_correlation(key):
+    corr_pair = filtered_correlation(key).abs().unstack().sort_values(ascending=False)
+    top_corr = corr_pair[corr_pair < 1].head(1)
+    if top_corr.empty:
+        return "n/a", "n/a", float("nan")
+    return (*top_corr.index[0], top_corr.values[0])
+
+feature_a, feature_b, value = strongest_correlation()
 st.metric("Strongest Correlation", f"{feature_a} ↔ {feature_b}", f"{value:.2f}", border=True)
 
 st.markdown("### Summary")
@@ -214,80 +133,88 @@ accident severity, confirming that speed remains a dominant factor.
 """)
 st.markdown("---")
     
-sns.set_style("whitegrid")
-
-# Helper function
-def show_plot(title, xlabel, ylabel, rotation=False):
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    if rotation:
-        plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
-    plt.clf()
+
+# Helper function: charts render once per filter state, then come from the figure cache.
+# Misses render in parallel and appear when charts.flush() is reached.
+charts = FigureBatch()
+
+def show_plot(chart_id, draw, title, xlabel, ylabel, rotation=False, figsize=(12, 7), **kwargs):
+    charts.show(chart_id, filter_key, draw, title, xlabel, ylabel, rotation, figsize, **kwargs)
 
 # --- BOX PLOTS ---
-with st.expander("Box Plots"):
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Accident_Severity', y='Biker_Age', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Biker Age by Accident Severity', 'Accident Severity', 'Biker Age')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Accident_Severity', y='Riding_Experience', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Riding Experience by Accident Severity', 'Accident Severity', 'Riding Experience (Years)')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Accident_Severity', y='Daily_Travel_Distance', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Daily Travel Distance by Accident Severity', 'Accident Severity', 'Daily Travel Distance')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Accident_Severity', y='Bike_Speed', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Bike Speed by Accident Severity', 'Accident Severity', 'Bike Speed')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Accident_Severity', y='Speed_Limit', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Speed Limit by Accident Severity', 'Accident Severity', 'Speed Limit')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.boxplot(x='Biker_Occupation', y='Bike_Speed', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Bike Speed by Biker Occupation', 'Biker Occupation', 'Bike Speed', rotation=True)
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+# Quartiles come from per-filter-cell sketches built once, not from the rows.
+# Expanders rerun the page when toggled and only build their charts while open.
+filter_key = current_filter_key()
+with st.expander("Box Plots", key="box_plots", on_change="rerun") as box_plots:
+    if box_plots.open:
+        show_plot('box_age_severity', draw_box_plot, 'Distribution of Biker Age by Accident Severity', 'Accident Severity', 'Biker Age',
+                  sketches=box_sketches(filter_key, 'Biker_Age', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('box_experience_severity', draw_box_plot, 'Distribution of Riding Experience by Accident Severity', 'Accident Severity', 'Riding Experience (Years)',
+                  sketches=box_sketches(filter_key, 'Riding_Experience', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('box_distance_severity', draw_box_plot, 'Distribution of Daily Travel Distance by Accident Severity', 'Accident Severity', 'Daily Travel Distance',
+                  sketches=box_sketches(filter_key, 'Daily_Travel_Distance', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('box_speed_severity', draw_box_plot, 'Distribution of Bike Speed by Accident Severity', 'Accident Severity', 'Bike Speed',
+                  sketches=box_sketches(filter_key, 'Bike_Speed', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('box_limit_severity', draw_box_plot, 'Distribution of Speed Limit by Accident Severity', 'Accident Severity', 'Speed Limit',
+                  sketches=box_sketches(filter_key, 'Speed_Limit', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('box_speed_occupation', draw_box_plot, 'Distribution of Bike Speed by Biker Occupation', 'Biker Occupation', 'Bike Speed', rotation=True,
+                  sketches=box_sketches(filter_key, 'Bike_Speed', 'Biker_Occupation'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
 
 # --- VIOLIN PLOTS ---
-with st.expander("Violin Plots"):
-    plt.figure(figsize=(12, 7))
-    sns.violinplot(x='Accident_Severity', y='Biker_Age', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Biker Age by Accident Severity (Violin Plot)', 'Accident Severity', 'Biker Age')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 7))
-    sns.violinplot(x='Weather', y='Bike_Speed', data=filtered_df, palette='viridis')
-    show_plot('Distribution of Bike Speed by Weather (Violin Plot)', 'Weather', 'Bike Speed')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+with st.expander("Violin Plots", key="violin_plots", on_change="rerun") as violin_plots:
+    if violin_plots.open:
+        show_plot('violin_age_severity', draw_violin_plot, 'Distribution of Biker Age by Accident Severity (Violin Plot)', 'Accident Severity', 'Biker Age',
+                  densities=violin_densities(filter_key, 'Biker_Age', 'Accident_Severity'),
+                  sketches=box_sketches(filter_key, 'Biker_Age', 'Accident_Severity'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('violin_speed_weather', draw_violin_plot, 'Distribution of Bike Speed by Weather (Violin Plot)', 'Weather', 'Bike Speed',
+                  densities=violin_densities(filter_key, 'Bike_Speed', 'Weather'),
+                  sketches=box_sketches(filter_key, 'Bike_Speed', 'Weather'), palette='viridis')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
 
 # --- SCATTER PLOTS ---
-with st.expander("Scatter Plots"):
-    plt.figure(figsize=(14, 10))
-    sns.scatterplot(x='Bike_Speed', y='Daily_Travel_Distance', hue='Accident_Severity', data=filtered_df, palette='viridis', alpha=0.6)
-    plt.legend(title='Accident Severity')
-    show_plot('Daily Travel Distance vs Bike Speed by Accident Severity', 'Bike Speed', 'Daily Travel Distance')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 8))
-    sns.scatterplot(x='Bike_Speed', y='Biker_Age', data=filtered_df, alpha=0.6)
-    show_plot('Biker Age vs Bike Speed', 'Bike Speed', 'Biker Age')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
-
-    plt.figure(figsize=(12, 8))
-    sns.scatterplot(x='Daily_Travel_Distance', y='Biker_Age', data=filtered_df, alpha=0.6)
-    show_plot('Biker Age vs Daily Travel Distance', 'Daily Travel Distance', 'Biker Age')
-    st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+with st.expander("Scatter Plots", key="scatter_plots", on_change="rerun") as scatter_plots:
+    if scatter_plots.open:
+        show_plot('scatter_distance_speed', draw_scatter_plot, 'Daily Travel Distance vs Bike Speed by Accident Severity', 'Bike Speed', 'Daily Travel Distance', figsize=(14, 10),
+                  layer=scatter_layer(filter_key, 'Bike_Speed', 'Daily_Travel_Distance', 'Accident_Severity'), palette='viridis', alpha=0.6, legend_title='Accident Severity')
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('scatter_age_speed', draw_scatter_plot, 'Biker Age vs Bike Speed', 'Bike Speed', 'Biker Age', figsize=(12, 8),
+                  layer=scatter_layer(filter_key, 'Bike_Speed', 'Biker_Age'), alpha=0.6)
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+        show_plot('scatter_age_distance', draw_scatter_plot, 'Biker Age vs Daily Travel Distance', 'Daily Travel Distance', 'Biker Age', figsize=(12, 8),
+                  layer=scatter_layer(filter_key, 'Daily_Travel_Distance', 'Biker_Age'), alpha=0.6)
+        st.success("**Interpretation:** Younger bikers show higher accident severity, suggesting overconfidence and less risk awareness.")
+
+# --- DENSITY PLOTS ---
+# Any numeric pair, binned on the server per severity: the browser gets one
+# count per grid cell instead of one point per row.
+@chart_fragment("density_heatmap")
+def density_heatmap(key, x, y):
+    return density_figure(density_grid(key, x, y), x, y)
+
+with st.expander("Density Plots", key="density_plots", on_change="rerun") as density_plots:
+    if density_plots.open:
+        col1, col2 = st.columns(2)
+        x_col = col1.selectbox("X Axis", SCATTER_COLUMNS, index=0, key="density_x")
+        y_col = col2.selectbox("Y Axis", SCATTER_COLUMNS, index=4, key="density_y")
+        st.plotly_chart(density_heatmap(x_col, y_col), use_container_width=True)
+        st.success("**Interpretation:** Dense cells for severe accidents sit at higher speeds, while no-accident rides cluster at moderate speeds and distances.")
+
+charts.flush()
 
 st.markdown("#### 💬 Observation")
 st.info("""
@@ -0,0 +1,230 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache import LRUCache
+from cube import category_codes
+from dataset import load_data
+from filters import FILTER_CACHE_MB, filter_hash, get_filter_cache, get_filter_engine
+
+# Numeric columns with more distinct values than this are coded into this many
+# quantile bins, which makes their rank statistics approximate; every column
+# of the bundled dataset has fewer, so its matrix is exact.
+ASSOCIATION_LEVELS = int(os.environ.get("SV25_ASSOCIATION_LEVELS", "256"))
+# Rows per step of the contingency table pass; bounds its scratch memory.
+CHUNK_ROWS = 1 << 14
+# Most level combinations per block of jointly coded columns.
+BLOCK_CELLS = 64
+
+# Measures offered for categorical x categorical pairs.
+CATEGORICAL_MEASURES = {"Cramér's V": "cramers_v", "Theil's U": "theils_u"}
+
+
+def _numeric_codes(values, levels):
+    """(codes, level values) of a numeric column; NaN gets code -1."""
+    present = ~np.isnan(values)
+    distinct, inverse = np.unique(values[present], return_inverse=True)
+    codes = np.full(len(values), -1, dtype=np.int64)
+    if len(distinct) <= levels:
+        codes[present] = inverse
+        return codes, distinct
+    edges = np.unique(np.quantile(values[present], np.linspace(0, 1, levels + 1)[1:-1]))
+    codes[present] = np.searchsorted(edges, values[present], side="right")
+    n = len(edges) + 1
+    means = np.bincount(codes[present], weights=values[present], minlength=n)
+    return codes, means / np.maximum(np.bincount(codes[present], minlength=n), 1)
+
+
+def _spearman(table):
+    """Spearman's rho from a table of two coded numeric columns, levels in value order."""
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    n = rows.sum()
+    # Average (1-based) rank of each level, as for tied values.
+    rank_a = np.cumsum(rows) - (rows - 1) / 2
+    rank_b = np.cumsum(cols) - (cols - 1) / 2
+    da, db = rank_a - rows @ rank_a / n, rank_b - cols @ rank_b / n
+    denominator = np.sqrt((rows @ (da * da)) * (cols @ (db * db)))
+    return da @ table @ db / denominator if denominator > 0 else np.nan
+
+
+def _correlation_ratio(table, values):
+    """Correlation ratio (eta) of a numeric column, by level, against a categorical one."""
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    n = rows.sum()
+    mean = rows @ values / n
+    total = rows @ (values - mean) ** 2
+    filled = cols > 0
+    group_means = (values @ table)[filled] / cols[filled]
+    between = cols[filled] @ (group_means - mean) ** 2
+    return np.sqrt(between / total) if total > 0 else np.nan
+
+
+def _cramers_v(table):
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    k = min(table.shape)
+    if k < 2:
+        return np.nan
+    n = table.sum()
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    phi2 = ((table - expected) ** 2 / expected).sum() / n
+    return np.sqrt(phi2 / (k - 1))
+
+
+def _entropy(p):
+    p = p[p > 0]
+    return -(p * np.log(p)).sum()
+
+
+def _theils_u(table):
+    """Uncertainty coefficient U(row | column): how much the column tells about the row."""
+    n = table.sum()
+    if n == 0:
+        return np.nan
+    h_row = _entropy(table.sum(axis=1) / n)
+    if h_row == 0:
+        return 1.0
+    # H(row | column) = H(row, column) - H(column)
+    h_given = _entropy(table.ravel() / n) - _entropy(table.sum(axis=0) / n)
+    return (h_row - h_given) / h_row
+
+
+class AssociationEngine:
+    """Association matrix across every column, numeric and categorical.
+
+    Every column is coded to small integers once. The contingency table of
+    every column pair then comes from one pass over the coded rows (a
+    bincount per chunk of rows, over joint codes of column blocks so one
+    increment serves several pairs), and each matrix entry is derived from
+    its pair's table alone:
+
+    - numeric x numeric: Spearman's rho, from the tables' average ranks;
+    - numeric x categorical: the correlation ratio (eta);
+    - categorical x categorical: Cramér's V or Theil's U(row | column).
+
+    Tables and matrices are cached per filter state.
+    """
+
+    def __init__(self, df, columns=None, levels=ASSOCIATION_LEVELS, cache=None):
+        self.columns = list(df.columns if columns is None else columns)
+        self.numeric = {}
+        self.levels = []
+        codes = []
+        for col in self.columns:
+            if pd.api.types.is_numeric_dtype(df[col].dtype):
+                col_codes, values = _numeric_codes(df[col].to_numpy(dtype="float64"), levels)
+                self.numeric[col] = values
+            else:
+                col_codes, values = category_codes(df[col])
+            # Missing values go to one extra level, dropped from every table.
+            self.levels.append(len(values))
+            codes.append(np.where(np.asarray(col_codes) < 0, len(values), col_codes))
+        self.sizes = [n + 1 for n in self.levels]
+        k = len(self.columns)
+        self.pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+
+        # Pack columns into blocks of at most BLOCK_CELLS level combinations
+        # (a wide column gets a block of its own) and count block pairs: one
+        # increment per row then fills the tables of many column pairs.
+        self.blocks, self.block_of = [], {}
+        for i in sorted(range(k), key=lambda i: self.sizes[i]):
+            block = self.blocks[-1] if self.blocks else None
+            if block is None or np.prod([self.sizes[m] for m in block]) * self.sizes[i] > BLOCK_CELLS:
+                block = []
+                self.blocks.append(block)
+            self.block_of[i] = (len(self.blocks) - 1, len(block))
+            block.append(i)
+        self.block_sizes = [int(np.prod([self.sizes[m] for m in block])) for block in self.blocks]
+        joint = np.zeros((len(df), len(self.blocks)), dtype=np.int32)
+        for b, block in enumerate(self.blocks):
+            for m in block:
+                joint[:, b] = joint[:, b] * self.sizes[m] + codes[m]
+        self.codes = joint
+        nb = len(self.blocks)
+        self.block_pairs = [(a, b) for a in range(nb) for b in range(a + 1, nb)] or [(0, 0)]
+        self._block_pair_index = {pair: p for p, pair in enumerate(self.block_pairs)}
+        cells = [self.block_sizes[a] * (self.block_sizes[b] if a != b else 1) for a, b in self.block_pairs]
+        self.offsets = np.concatenate([[0], np.cumsum(cells)])
+        self._left = np.array([a for a, _ in self.block_pairs])
+        self._right = np.array([b for _, b in self.block_pairs])
+        self._scale = np.array([self.block_sizes[b] if a != b else 0 for a, b in self.block_pairs], dtype=np.int64)
+        self._results = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+
+    def tables(self, key=(), rows=None):
+        """Counts of every block pair's joint table, concatenated; see table()."""
+        cache_key = ("association_tables", filter_hash(key))
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            return cached
+        counts = np.zeros(self.offsets[-1], dtype=np.int64)
+        right = np.where(self._scale > 0, 1, 0)
+        n = len(self.codes) if rows is None else len(rows)
+        for start in range(0, n, CHUNK_ROWS):
+            chunk = self.codes[start:start + CHUNK_ROWS] if rows is None else self.codes[rows[start:start + CHUNK_ROWS]]
+            flat = chunk[:, self._left].astype(np.int64) * np.maximum(self._scale, 1)
+            flat += chunk[:, self._right] * right + self.offsets[:-1]
+            counts += np.bincount(flat.ravel(), minlength=len(counts))
+        self._results.put(cache_key, counts, counts.nbytes)
+        return counts
+
+    def table(self, counts, i, j):
+        """Contingency table of columns i and j, missing values dropped."""
+        (a, pos_i), (b, pos_j) = self.block_of[i], self.block_of[j]
+        if a == b:
+            # Both in one block: any block pair holding it has their table.
+            other = next(((x, y) for x, y in self.block_pairs if a in (x, y)))
+        else:
+            other = (min(a, b), max(a, b))
+        p = self._block_pair_index[other]
+        x, y = other
+        shape = [self.sizes[m] for m in self.blocks[x]]
+        if y != x:
+            shape += [self.sizes[m] for m in self.blocks[y]]
+        joint = counts[self.offsets[p]:self.offsets[p + 1]].reshape(shape)
+        axis_i = pos_i + (len(self.blocks[x]) if a != x else 0)
+        axis_j = pos_j + (len(self.blocks[x]) if b != x else 0)
+        keep = sorted({axis_i, axis_j})
+        table = joint.sum(axis=tuple(ax for ax in range(joint.ndim) if ax not in keep))
+        if axis_i > axis_j:
+            table = table.T
+        return table[:self.levels[i], :self.levels[j]]
+
+    def matrix(self, key=(), rows=None, categorical="cramers_v"):
+        """DataFrame of pairwise associations in [-1, 1] (Spearman) or [0, 1] (the rest)."""
+        cache_key = ("association_matrix", filter_hash(key), categorical)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            return cached
+        counts = self.tables(key, rows)
+        k = len(self.columns)
+        result = np.eye(k)
+        for i, j in self.pairs:
+            table = self.table(counts, i, j).astype(np.float64)
+            a, b = self.columns[i], self.columns[j]
+            if not table.any():
+                result[i, j] = result[j, i] = np.nan
+            elif a in self.numeric and b in self.numeric:
+                result[i, j] = result[j, i] = _spearman(table)
+            elif a in self.numeric:
+                result[i, j] = result[j, i] = _correlation_ratio(table, self.numeric[a])
+            elif b in self.numeric:
+                result[i, j] = result[j, i] = _correlation_ratio(table.T, self.numeric[b])
+            elif categorical == "theils_u":
+                result[i, j], result[j, i] = _theils_u(table), _theils_u(table.T)
+            else:
+                result[i, j] = result[j, i] = _cramers_v(table)
+        matrix = pd.DataFrame(result, index=self.columns, columns=self.columns)
+        self._results.put(cache_key, matrix, result.nbytes)
+        return matrix
+
+
+@st.cache_resource(show_spinner=False)
+def get_association_engine():
+    return AssociationEngine(load_data(), cache=get_filter_cache())
+
+
+def association_matrix(key, categorical="cramers_v"):
+    """Mixed-type association matrix of every column for a canonical filter key."""
+    rows = get_filter_engine().rows_for_key(key)
+    return get_association_engine().matrix(key, rows, categorical)
@@ -1,6 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from dataset import load_data
+from filters import current_filter_key, sidebar_filters
+from behavior_metrics import behavior_counts, behavior_distributions, behavior_rate
+from export import EXPORT_FORMATS, download_button, export_status
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -9,12 +12,6 @@ st.set_page_config(page_title="Motorbike Accident Insights Dashboard", page_icon
 
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
-    df = pd.read_csv(url)
-    return df
-
 df = load_data()
 
 
@@ -85,93 +82,10 @@ with st.sidebar:
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        severity = st.multiselect(
-            "Accident Severity",
-            options=sorted(df["Accident_Severity"].dropna().unique()),
-            default=sorted(df["Accident_Severity"].dropna().unique())
-        )
-
-        weather = st.multiselect(
-            "Weather Condition",
-            options=sorted(df["Weather"].dropna().unique()),
-            default=sorted(df["Weather"].dropna().unique())
-        )
-
-        time_of_day = st.multiselect(
-            "Time of Day",
-            options=sorted(df["Time_of_Day"].dropna().unique()),
-            default=sorted(df["Time_of_Day"].dropna().unique())
-        )
-
-        road_type = st.multiselect(
-            "Road Type",
-            options=sorted(df["Road_Type"].dropna().unique()),
-            default=sorted(df["Road_Type"].dropna().unique())
-        )
-
-        # --- Optional Filters ---
-        if "Biker_Alcohol" in df.columns:
-            alcohol = st.multiselect(
-                "Biker Alcohol Consumption",
-                options=sorted(df["Biker_Alcohol"].dropna().unique()),
-                default=sorted(df["Biker_Alcohol"].dropna().unique())
-            )
-        else:
-            alcohol = []
-
-        if "Traffic_Density" in df.columns:
-            traffic = st.multiselect(
-                "Traffic Density",
-                options=sorted(df["Traffic_Density"].dropna().unique()),
-                default=sorted(df["Traffic_Density"].dropna().unique())
-            )
-        else:
-            traffic = []
-
-        if "Valid_Driving_License" in df.columns:
-            license_status = st.multiselect(
-                "Valid Driving License",
-                options=sorted(df["Valid_Driving_License"].dropna().unique()),
-                default=sorted(df["Valid_Driving_License"].dropna().unique())
-            )
-        else:
-            license_status = []
-
-        # --- Numeric Filter: Biker Age ---
-        if "Biker_Age" in df.columns:
-            min_age, max_age = st.slider(
-                "Filter by Biker Age",
-                int(df["Biker_Age"].min()),
-                int(df["Biker_Age"].max()),
-                (int(df["Biker_Age"].min()), int(df["Biker_Age"].max()))
-            )
-        else:
-            min_age, max_age = None, None
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        if severity:
-            filtered_df = filtered_df[filtered_df["Accident_Severity"].isin(severity)]
-        if weather:
-            filtered_df = filtered_df[filtered_df["Weather"].isin(weather)]
-        if time_of_day:
-            filtered_df = filtered_df[filtered_df["Time_of_Day"].isin(time_of_day)]
-        if road_type:
-            filtered_df = filtered_df[filtered_df["Road_Type"].isin(road_type)]
-        if alcohol:
-            filtered_df = filtered_df[filtered_df["Biker_Alcohol"].isin(alcohol)]
-        if traffic:
-            filtered_df = filtered_df[filtered_df["Traffic_Density"].isin(traffic)]
-        if license_status:
-            filtered_df = filtered_df[filtered_df["Valid_Driving_License"].isin(license_status)]
-        if min_age is not None:
-            filtered_df = filtered_df[
-                (filtered_df["Biker_Age"] >= min_age) & (filtered_df["Biker_Age"] <= max_age)
-            ]
+        filtered_df = sidebar_filters(df)
 
     # --- Reset and Download Buttons ---
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
@@ -180,12 +94,8 @@ with st.sidebar:
             st.rerun()
 
     with col2:
-        st.download_button(
-            label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
-            file_name="motor_accident_data.csv",
-            mime="text/csv"
-        )
+        download_button(current_filter_key(), export_format)
+    export_status()
     st.markdown("---")
 
 # ===== THEME TOGGLE =====
@@ -213,11 +123,13 @@ color_theme = px.colors.qualitative.Pastel
 st.header("Riding Behavior Insights")
 st.markdown("Analyze rider behavior patterns and how habits influence accident severity.")
 
-# Calculate percentages
-helmet = (filtered_df['Wearing_Helmet'].value_counts(normalize=True).get('Yes', 0) * 100)
-alcohol = (filtered_df['Biker_Alcohol'].value_counts(normalize=True).get('Yes', 0) * 100)
-talk = (filtered_df['Talk_While_Riding'].value_counts(normalize=True).get('Yes', 0) * 100)
-smoke = (filtered_df['Smoke_While_Riding'].value_counts(normalize=True).get('Yes', 0) * 100)
+# Every behavior column's distribution, overall and by severity, from one
+# pass over coded rows; the cards and bar charts below all read from it.
+behavior = behavior_distributions(current_filter_key())
+helmet = behavior_rate(behavior, 'Wearing_Helmet')
+alcohol = behavior_rate(behavior, 'Biker_Alcohol')
+talk = behavior_rate(behavior, 'Talk_While_Riding')
+smoke = behavior_rate(behavior, 'Smoke_While_Riding')
 
 # Styled metric summary using HTML/CSS
 st.markdown("""
@@ -294,9 +206,8 @@ color_theme = px.colors.qualitative.Pastel
 
 # Professional bar charts
 for col in behavior_cols:
-    if col in filtered_df.columns:
-        data = filtered_df[col].value_counts().reset_index()
-        data.columns = [col, "Count"]
+    if col in behavior:
+        data = behavior_counts(behavior, col)
 
         fig = px.bar(
             data,
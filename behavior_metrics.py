@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache import LRUCache
+from cube import category_codes
+from dataset import load_data
+from filters import FILTER_CACHE_MB, filter_hash, get_filter_cache, get_filter_engine
+
+BEHAVIOR_COLUMNS = ["Talk_While_Riding", "Smoke_While_Riding", "Wearing_Helmet", "Biker_Alcohol"]
+BEHAVIOR_SPLIT = "Accident_Severity"
+# Rows whose codes are widened to intp per bincount call.
+BINCOUNT_ROWS = 1 << 16
+
+
+class BehaviorMetrics:
+    """Distributions of the riding-behavior columns for any filter state.
+
+    Every behavior column and the severity column are coded to small
+    integers once. A filter state is then one bincount over the selected
+    rows, on joint (column, severity, level) codes, which gives every
+    column's counts per severity at once; the overall counts are their sum.
+    Joint codes are stored in the narrowest integer type that holds them
+    (int16 for these columns). Results are cached per filter state.
+    """
+
+    def __init__(self, df, columns=BEHAVIOR_COLUMNS, split=BEHAVIOR_SPLIT, cache=None):
+        self.columns = [col for col in columns if col in df.columns]
+        split_codes, self.groups = category_codes(df[split])
+        self.split = split
+        self.labels = []
+        sizes = []
+        codes = []
+        for col in self.columns:
+            col_codes, labels = category_codes(df[col])
+            self.labels.append(labels)
+            # Missing values go to one extra level (and severity group), dropped from the result.
+            sizes.append(len(labels) + 1)
+            codes.append(np.where(col_codes < 0, len(labels), col_codes))
+        self.sizes = sizes
+        self.offsets = np.concatenate([[0], np.cumsum([(len(self.groups) + 1) * n for n in sizes])])
+        dtype = np.int16 if self.offsets[-1] <= np.iinfo(np.int16).max else np.int32
+        groups = np.where(split_codes < 0, len(self.groups), split_codes).astype(dtype)
+        self.codes = np.stack([
+            (self.offsets[i] + groups * sizes[i] + codes[i]).astype(dtype) for i in range(len(self.columns))
+        ], axis=1)
+        self._results = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+
+    def distributions(self, key=(), rows=None):
+        """{column: DataFrame of counts, behavior levels x severity groups} of the filtered rows."""
+        cache_key = ("behavior", filter_hash(key))
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            return cached
+        codes = self.codes if rows is None else self.codes[rows]
+        counts = np.zeros(self.offsets[-1], dtype=np.int64)
+        for start in range(0, len(codes), BINCOUNT_ROWS):
+            chunk = codes[start:start + BINCOUNT_ROWS].ravel().astype(np.intp)
+            counts += np.bincount(chunk, minlength=self.offsets[-1])
+        result = {}
+        for i, col in enumerate(self.columns):
+            table = counts[self.offsets[i]:self.offsets[i + 1]].reshape(len(self.groups) + 1, self.sizes[i])
+            result[col] = pd.DataFrame(table[:-1, :-1].T, index=pd.Index(self.labels[i], name=col),
+                                       columns=pd.Index(self.groups, name=self.split))
+        self._results.put(cache_key, result, sum(table.memory_usage().sum() for table in result.values()))
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_behavior_metrics():
+    return BehaviorMetrics(load_data(), cache=get_filter_cache())
+
+
+def behavior_distributions(key):
+    """Behavior column distributions, overall and by severity, for a canonical filter key."""
+    rows = get_filter_engine().rows_for_key(key)
+    return get_behavior_metrics().distributions(key, rows)
+
+
+def behavior_rate(distributions, col, level="Yes"):
+    """Percentage of the filtered rows with `level` in `col`; 0 when none match."""
+    counts = distributions[col].sum(axis=1)
+    total = counts.sum()
+    return 100 * counts.get(level, 0) / total if total else 0.0
+
+
+def behavior_counts(distributions, col):
+    """[col, "Count"] frame of a column's overall counts, largest first, as value_counts() orders them."""
+    counts = distributions[col].sum(axis=1).sort_values(ascending=False, kind="stable")
+    return counts.rename("Count").reset_index()
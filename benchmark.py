@@ -0,0 +1,672 @@
+"""Micro-benchmarks for the dashboard's data paths.
+
+Run one suite with ``python benchmark.py <suite>`` or all of them with
+``python benchmark.py all``.
+"""
+import argparse
+import io
+import os
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import datasource
+from cube import FACTOR_COLUMNS, CubeBuilder
+from density import DensityService
+from filters import CATEGORY_FILTERS, FilterEngine, SortedIndex, in_row_order
+from histogram import HISTOGRAM_COLUMNS, HistogramService
+from schema import apply_schema, memory_report
+from sketch import SKETCH_COLUMNS, SketchStore
+
+
+def timed(fn, repeat=5):
+    """Run fn repeat times and return (median seconds, last result)."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def scaled_dataset(rows, seed=0):
+    """The typed dataset resampled with replacement to the requested row count."""
+    df = datasource.read_dataset()
+    rng = np.random.default_rng(seed)
+    return df.take(rng.integers(0, len(df), rows)).reset_index(drop=True)
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name:<{width}}  {value}")
+
+
+# --- DATA SOURCE ---
+def bench_source(repeat=5):
+    datasource.build_snapshot()
+    rows = []
+    try:
+        seconds, _ = timed(datasource.read_remote_csv, repeat)
+        rows.append(("CSV over HTTP", f"{seconds * 1000:8.1f} ms"))
+    except OSError as exc:
+        rows.append(("CSV over HTTP", f"unavailable ({exc})"))
+    seconds, _ = timed(datasource.read_local_csv, repeat)
+    rows.append(("local CSV", f"{seconds * 1000:8.1f} ms"))
+    seconds, _ = timed(datasource.read_snapshot, repeat)
+    rows.append(("local Parquet", f"{seconds * 1000:8.1f} ms"))
+    seconds, _ = timed(datasource.read_dataset, repeat)
+    rows.append(("read_dataset()", f"{seconds * 1000:8.1f} ms"))
+    report("Cold dataset read (median of %d)" % repeat, rows)
+
+
+# --- SCHEMA ---
+def bench_schema():
+    raw = datasource.read_local_csv()
+    typed = apply_schema(raw)
+    table = memory_report(raw, typed)
+    print("\nMemory per row, raw CSV dtypes vs declared schema")
+    print(table.to_string(float_format=lambda v: f"{v:8.2f}"))
+    before = table.loc["TOTAL", "raw_bytes_per_row"]
+    after = table.loc["TOTAL", "typed_bytes_per_row"]
+    print(f"\n  {before:.1f} -> {after:.1f} bytes/row ({before / after:.1f}x smaller)")
+
+
+# --- FILTERS ---
+def _chained_filter(df, selections, age_range):
+    # The per-page filter block this engine replaced.
+    filtered_df = df.copy()
+    for col, selected in selections.items():
+        if selected:
+            filtered_df = filtered_df[filtered_df[col].isin(selected)]
+    low, high = age_range
+    return filtered_df[(filtered_df["Biker_Age"] >= low) & (filtered_df["Biker_Age"] <= high)]
+
+
+def _sample_selection(engine):
+    # Drop one value from every filter so each one actually masks rows.
+    selections = {col: engine.options(col)[1:] for col, _ in CATEGORY_FILTERS}
+    return selections, (20, 60)
+
+
+def bench_filters(sizes=(15_100, 1_000_000, 10_000_000)):
+    for size in sizes:
+        df = scaled_dataset(size)
+        build, engine = timed(lambda: FilterEngine(df), repeat=1)
+        selections, age_range = _sample_selection(engine)
+        repeat = 3 if size > 1_000_000 else 7
+        chained, expected = timed(lambda: _chained_filter(df, selections, age_range), repeat)
+        key = engine.canonical(selections, {"Biker_Age": age_range})
+        ids, rows = timed(lambda: engine._compute(key), repeat)
+        frame, _ = timed(lambda: df.take(engine._compute(key)), repeat)
+        engine.row_ids(selections, {"Biker_Age": age_range})
+        hit, _ = timed(lambda: engine.row_ids(selections, {"Biker_Age": age_range}), repeat)
+        assert np.array_equal(rows, expected.index.to_numpy())
+        report(f"Sidebar filter, {size:,} rows ({len(rows):,} match)", [
+            ("index build (once)", f"{build * 1000:8.1f} ms"),
+            ("copy + chained isin", f"{chained * 1000:8.1f} ms"),
+            ("bitmap -> row ids", f"{ids * 1000:8.1f} ms"),
+            ("bitmap -> DataFrame", f"{frame * 1000:8.1f} ms"),
+            ("cached row ids", f"{hit * 1000:8.3f} ms"),
+            ("filter cache", engine.cache.stats()),
+        ])
+
+
+def bench_ranges(sizes=(15_100, 1_000_000, 10_000_000)):
+    for size in sizes:
+        df = scaled_dataset(size)
+        ages = df["Biker_Age"].to_numpy()
+        build, index = timed(lambda: SortedIndex(df["Biker_Age"]), repeat=1)
+        repeat = 3 if size > 1_000_000 else 7
+        mask, expected = timed(lambda: np.flatnonzero((ages >= 30) & (ages <= 32)), repeat)
+        lookup, rows = timed(lambda: in_row_order(index.lookup(30, 32)), repeat)
+        assert np.array_equal(rows, expected)
+        report(f"Biker_Age 30-32, {size:,} rows ({len(rows):,} match)", [
+            ("sorted index build (once)", f"{build * 1000:8.1f} ms"),
+            ("two full-column compares", f"{mask * 1000:8.2f} ms"),
+            ("searchsorted + row order", f"{lookup * 1000:8.2f} ms"),
+        ])
+
+
+# --- COUNT CUBE ---
+def _groupby_tables(df):
+    # The per-rerun path on the factor pages.
+    return {
+        col: df.groupby([col, "Accident_Severity"]).size().reset_index(name="Count")
+        for col in FACTOR_COLUMNS
+    }
+
+
+def bench_cube(sizes=(1_000_000, 5_000_000)):
+    for size in sizes:
+        df = scaled_dataset(size)
+        engine = FilterEngine(df)
+        build, builder = timed(lambda: CubeBuilder(df), repeat=1)
+        selections = {"Weather": ["Clear", "Rainy"], "Traffic_Density": [1, 2, 3, 4]}
+        key = engine.canonical(selections)
+        filtered = engine.apply(df, selections)
+        groupby_all, _ = timed(lambda: _groupby_tables(df), 3)
+        groupby_sel, _ = timed(lambda: _groupby_tables(filtered), 3)
+        cube_all, _ = timed(lambda: builder.build().crosstabs(FACTOR_COLUMNS), 3)
+        cube_sel, _ = timed(lambda: builder.base.slice(dict(key)).crosstabs(FACTOR_COLUMNS), 3)
+        cube_hit, _ = timed(lambda: builder.base.crosstabs(FACTOR_COLUMNS), 3)
+        ranged = engine.canonical(selections, {"Biker_Age": (20, 40)})
+        rows = engine.rows_for_key(ranged)
+        ranged_df = df.take(rows)
+        groupby_rng, _ = timed(lambda: _groupby_tables(ranged_df), 3)
+        batched_rng, _ = timed(lambda: builder.crosstabs(rows), 3)
+        report(f"12 factor tables x severity, {size:,} rows", [
+            ("cube build (once)", f"{build * 1000:8.1f} ms"),
+            ("groupby, all rows", f"{groupby_all * 1000:8.1f} ms"),
+            ("cube rebuild + tables", f"{cube_all * 1000:8.1f} ms"),
+            ("cached cube tables", f"{cube_hit * 1000:8.1f} ms"),
+            ("groupby, filtered", f"{groupby_sel * 1000:8.1f} ms"),
+            ("cube slice, filtered", f"{cube_sel * 1000:8.1f} ms"),
+            (f"groupby, + age range ({len(rows):,} rows)", f"{groupby_rng * 1000:8.1f} ms"),
+            ("single-pass crosstabs, + age range", f"{batched_rng * 1000:8.1f} ms"),
+        ])
+
+
+# --- HISTOGRAMS ---
+def bench_histograms(sizes=(15_100, 1_000_000)):
+    import plotly.express as px
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        service = HistogramService(df)
+        for col in HISTOGRAM_COLUMNS:
+            service.counts(col)
+        raw_time, raw_json = timed(
+            lambda: [px.histogram(df, x=col, nbins=20).to_json() for col in HISTOGRAM_COLUMNS], 1
+        )
+        binned_time, binned_json = timed(
+            lambda: [
+                px.bar(x=service.edges(col)[:-1], y=service.counts(col)[1]).to_json()
+                for col in HISTOGRAM_COLUMNS
+            ],
+            3,
+        )
+        report(f"4 histograms, {size:,} rows", [
+            ("px.histogram on raw rows", f"{raw_time * 1000:8.1f} ms, {sum(map(len, raw_json)):>12,} bytes JSON"),
+            ("server-side bin counts", f"{binned_time * 1000:8.1f} ms, {sum(map(len, binned_json)):>12,} bytes JSON"),
+        ])
+
+
+# --- BOX PLOT SKETCHES ---
+BOX_PLOTS = [(col, "Accident_Severity") for col in SKETCH_COLUMNS] + [("Bike_Speed", "Biker_Occupation")]
+BOX_STATS = ["q1", "med", "q3", "whislo", "whishi"]
+
+
+def _exact_box_stats(df, rows, col, group):
+    from matplotlib.cbook import boxplot_stats
+
+    sub = df if rows is None else df.take(rows)
+    return {
+        label: boxplot_stats(values.to_numpy(dtype="float64"))[0]
+        for label, values in sub.groupby(group, observed=True)[col]
+    }
+
+
+def _uncached_sketches(store, key):
+    store._slices.clear()
+    return {plot: store.sketches(*plot, key=key) for plot in BOX_PLOTS}
+
+
+def bench_sketches(sizes=(32, 64, 128, 256, 1024), rows=1_000_000):
+    df = scaled_dataset(rows)
+    engine = FilterEngine(df)
+    key = engine.canonical(_sample_selection(engine)[0])
+    row_ids = engine.rows_for_key(key)
+    exact_time, exact = timed(
+        lambda: {plot: _exact_box_stats(df, row_ids, *plot) for plot in BOX_PLOTS}, 3
+    )
+    result = [("exact (matplotlib boxplot_stats)", f"{exact_time * 1000:8.1f} ms")]
+    for size in sizes:
+        build_time, store = timed(lambda: SketchStore(df, size=size), 1)
+        start = time.perf_counter()
+        for plot in BOX_PLOTS:
+            store.cell_counts(*plot)
+        build_time += time.perf_counter() - start
+        query_time, sketches = timed(lambda: _uncached_sketches(store, key), 3)
+        # Worst box-stat error of any group, relative to the column's range.
+        error = 0.0
+        for (col, group), by_label in sketches.items():
+            span = float(df[col].max() - df[col].min()) or 1.0
+            for label, stats in exact[(col, group)].items():
+                got = by_label[label].box_stats(label)
+                error = max(error, max(abs(got[s] - stats[s]) for s in BOX_STATS) / span)
+        nbytes = sum(counts.nbytes for counts in store._counts.values())
+        result.append((
+            f"sketch, {size} buckets",
+            f"{query_time * 1000:8.1f} ms, max error {error:7.3%} of range,"
+            f" build {build_time * 1000:7.1f} ms, {nbytes / 2**20:6.1f} MiB",
+        ))
+    report(f"6 box plots, {rows:,} rows, categorical filter (median of 3)", result)
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sketch import draw_box_plot
+
+    def render(draw):
+        fig, ax = plt.subplots(figsize=(12, 7))
+        draw(ax)
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+
+    sub = df.take(row_ids)
+    store = SketchStore(df)
+    for plot in BOX_PLOTS:
+        store.cell_counts(*plot)
+    seaborn_time, _ = timed(lambda: render(
+        lambda ax: sns.boxplot(x="Accident_Severity", y="Biker_Age", data=sub, ax=ax)
+    ), 3)
+    sketch_time, _ = timed(lambda: render(
+        lambda ax: draw_box_plot(ax, _uncached_sketches(store, key)[("Biker_Age", "Accident_Severity")])
+    ), 3)
+    report(f"Biker_Age box plot rendered to PNG, {rows:,} rows", [
+        ("seaborn.boxplot on filtered rows", f"{seaborn_time * 1000:8.1f} ms"),
+        ("sketches + Axes.bxp", f"{sketch_time * 1000:8.1f} ms"),
+    ])
+
+
+# --- VIOLIN DENSITIES ---
+VIOLIN_PLOTS = [("Biker_Age", "Accident_Severity"), ("Bike_Speed", "Weather")]
+
+
+def bench_violins(sizes=(100_000, 5_000_000)):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from density import draw_violin_plot
+
+    def render(draw):
+        for col, group in VIOLIN_PLOTS:
+            fig, ax = plt.subplots(figsize=(12, 7))
+            draw(ax, col, group)
+            fig.savefig(io.BytesIO(), format="png")
+            plt.close(fig)
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        service = DensityService(df)
+
+        def uncached():
+            service._densities.clear()
+            return [service.densities(col, group) for col, group in VIOLIN_PLOTS]
+
+        seaborn_time, _ = timed(lambda: render(
+            lambda ax, col, group: sns.violinplot(x=group, y=col, hue=group, data=df, palette="viridis", ax=ax)
+        ), 1)
+        binned_time, _ = timed(uncached, 3)
+        cached_time, _ = timed(lambda: [service.densities(col, group) for col, group in VIOLIN_PLOTS], 3)
+        drawn_time, _ = timed(lambda: render(
+            lambda ax, col, group: draw_violin_plot(ax, service.densities(col, group))
+        ), 3)
+        report(f"2 violin plots, {size:,} rows", [
+            ("seaborn.violinplot, render to PNG", f"{seaborn_time * 1000:9.1f} ms"),
+            ("binned FFT KDE", f"{binned_time * 1000:9.1f} ms"),
+            ("binned FFT KDE, cached", f"{cached_time * 1000:9.3f} ms"),
+            ("cached KDE, render to PNG", f"{drawn_time * 1000:9.1f} ms"),
+        ])
+
+
+# --- SCATTER PLOTS ---
+SCATTER_PLOTS = [
+    ("Bike_Speed", "Daily_Travel_Distance", "Accident_Severity"),
+    ("Bike_Speed", "Biker_Age", None),
+    ("Daily_Travel_Distance", "Biker_Age", None),
+]
+
+
+def bench_scatter(sizes=(15_100, 100_000, 1_000_000), sample=2_000):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from scatter import ScatterService, draw_scatter_plot
+
+    def render(draw):
+        for i, (x, y, hue) in enumerate(SCATTER_PLOTS):
+            fig, ax = plt.subplots(figsize=(12, 8))
+            draw(ax, i, x, y, hue)
+            fig.savefig(io.BytesIO(), format="png")
+            plt.close(fig)
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        service = ScatterService(df)
+
+        def layers(limit, sample=0):
+            service._layers.clear()
+            return [service.layer(x, y, hue, limit=limit, sample=sample) for x, y, hue in SCATTER_PLOTS]
+
+        points_time, _ = timed(lambda: render(
+            lambda ax, i, x, y, hue: sns.scatterplot(x=x, y=y, hue=hue, data=df, palette="viridis", alpha=0.6, ax=ax)
+        ), 1)
+        binned_time, rasters = timed(lambda: layers(0), 3)
+        _, sampled = timed(lambda: layers(0, sample), 1)
+        raster_time, _ = timed(lambda: render(
+            lambda ax, i, x, y, hue: draw_scatter_plot(ax, rasters[i], "viridis")
+        ), 3)
+        overlay_time, _ = timed(lambda: render(
+            lambda ax, i, x, y, hue: draw_scatter_plot(ax, sampled[i], "viridis")
+        ), 3)
+        report(f"3 scatter plots, {size:,} rows", [
+            ("seaborn.scatterplot, render to PNG", f"{points_time * 1000:9.1f} ms"),
+            ("2D bin counts", f"{binned_time * 1000:9.1f} ms"),
+            ("raster, render to PNG", f"{raster_time * 1000:9.1f} ms"),
+            (f"raster + {sample:,}-row sample, render to PNG", f"{overlay_time * 1000:9.1f} ms"),
+        ])
+
+
+def bench_pairs(sizes=(1_000_000, 5_000_000)):
+    from itertools import combinations
+
+    from scatter import SCATTER_COLUMNS, ScatterService, density_figure
+
+    pairs = list(combinations(SCATTER_COLUMNS, 2))
+    for size in sizes:
+        df = scaled_dataset(size)
+        service = ScatterService(df)
+        engine = FilterEngine(df)
+        selections, age_range = _sample_selection(engine)
+        key = engine.canonical(selections, {"Biker_Age": age_range})
+        rows = engine.rows_for_key(key)
+
+        def grids(key, rows):
+            service._layers.clear()
+            return [service.grid(x, y, "Accident_Severity", key, rows) for x, y in pairs]
+
+        all_time, _ = timed(lambda: grids((), None), 3)
+        filtered_time, result = timed(lambda: grids(key, rows), 3)
+        cached_time, _ = timed(lambda: [service.grid(x, y, "Accident_Severity", key, rows) for x, y in pairs], 3)
+        payload = len(density_figure(result[0], *pairs[0]).to_json())
+        report(f"{len(pairs)} faceted density grids, {size:,} rows", [
+            ("all rows", f"{all_time * 1000:9.1f} ms"),
+            (f"filtered, {len(rows):,} rows", f"{filtered_time * 1000:9.1f} ms"),
+            ("filtered, cached", f"{cached_time * 1000:9.3f} ms"),
+            (f"figure JSON, {pairs[0][1]} vs {pairs[0][0]}", f"{payload / 1024:9.1f} KiB"),
+            ("raw x, y, severity as float64, all rows", f"{size * 24 / 1024:9.1f} KiB"),
+        ])
+
+
+# --- CORRELATIONS ---
+def bench_correlation(sizes=(1_000_000, 5_000_000)):
+    from covariance import CorrelationEngine
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        filters = FilterEngine(df)
+        selections, age_range = _sample_selection(filters)
+        keys = {
+            "all rows": (),
+            "multiselect filters": filters.canonical(selections),
+            "with an age range": filters.canonical(selections, {"Biker_Age": age_range}),
+        }
+        build_time, engine = timed(lambda: CorrelationEngine(df), 1)
+        result = [("per-cell cross products, built once", f"{build_time * 1000:9.1f} ms")]
+        error = 0.0
+        for label, key in keys.items():
+            rows = filters.rows_for_key(key)
+            pandas_time, expected = timed(lambda: (df if rows is None else df.take(rows))[engine.columns].corr(), 3)
+
+            def uncached():
+                engine._results.clear()
+                return engine.correlation(key, rows)
+
+            engine_time, corr = timed(uncached, 3)
+            cached_time, _ = timed(lambda: engine.correlation(key, rows), 3)
+            error = max(error, float(np.nanmax(np.abs(corr.to_numpy() - expected.to_numpy()))))
+            result += [
+                (f"{label}: filter rows + DataFrame.corr", f"{pandas_time * 1000:9.1f} ms"),
+                (f"{label}: engine", f"{engine_time * 1000:9.1f} ms"),
+                (f"{label}: engine, cached", f"{cached_time * 1000:9.3f} ms"),
+            ]
+        result.append(("max |engine - pandas|", f"{error:9.1e}"))
+        report(f"{len(engine.columns)}x{len(engine.columns)} correlation matrix, {size:,} rows", result)
+
+
+def bench_association(sizes=(15_100, 1_000_000)):
+    from association import AssociationEngine
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        filters = FilterEngine(df)
+        selections, age_range = _sample_selection(filters)
+        key = filters.canonical(selections, {"Biker_Age": age_range})
+        rows = filters.rows_for_key(key)
+        build_time, engine = timed(lambda: AssociationEngine(df), 1)
+        k = len(engine.columns)
+
+        def uncached(key, rows, categorical="cramers_v"):
+            engine._results.clear()
+            return engine.matrix(key, rows, categorical)
+
+        numeric = list(engine.numeric)
+        pandas_time, expected = timed(lambda: df[numeric].corr(method="spearman"), 1)
+        all_time, matrix = timed(lambda: uncached((), None), 3)
+        theil_time, _ = timed(lambda: uncached((), None, "theils_u"), 3)
+        filtered_time, _ = timed(lambda: uncached(key, rows), 3)
+        cached_time, _ = timed(lambda: engine.matrix(key, rows), 3)
+        error = float(np.nanmax(np.abs(matrix.loc[numeric, numeric].to_numpy() - expected.to_numpy())))
+        report(f"{k}x{k} mixed association matrix, {size:,} rows", [
+            ("code columns, once", f"{build_time * 1000:9.1f} ms"),
+            (f"DataFrame.corr(spearman), {len(numeric)} numeric only", f"{pandas_time * 1000:9.1f} ms"),
+            (f"all rows, {len(engine.pairs)} tables + Cramér's V", f"{all_time * 1000:9.1f} ms"),
+            ("all rows, Theil's U", f"{theil_time * 1000:9.1f} ms"),
+            (f"filtered, {len(rows):,} rows", f"{filtered_time * 1000:9.1f} ms"),
+            ("filtered, cached", f"{cached_time * 1000:9.3f} ms"),
+            ("max |Spearman - pandas|", f"{error:9.1e}"),
+        ])
+
+
+def bench_behavior(sizes=(15_100, 1_000_000)):
+    from behavior_metrics import BEHAVIOR_COLUMNS, BehaviorMetrics
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        filters = FilterEngine(df)
+        selections, age_range = _sample_selection(filters)
+        key = filters.canonical(selections, {"Biker_Age": age_range})
+        rows = filters.rows_for_key(key)
+        build_time, metrics = timed(lambda: BehaviorMetrics(df), 1)
+
+        def per_chart(frame):
+            # The page before: a normalized value_counts per metric card, then one per bar chart.
+            rates = [frame[col].value_counts(normalize=True).get("Yes", 0) for col in BEHAVIOR_COLUMNS]
+            return rates, [frame[col].value_counts() for col in BEHAVIOR_COLUMNS]
+
+        def uncached(key, rows):
+            metrics._results.clear()
+            return metrics.distributions(key, rows)
+
+        subset = df.take(rows)
+        pandas_time, _ = timed(lambda: per_chart(subset), 3)
+        split_time, _ = timed(lambda: [pd.crosstab(subset[col], subset["Accident_Severity"]) for col in BEHAVIOR_COLUMNS], 3)
+        all_time, _ = timed(lambda: uncached((), None), 3)
+        filtered_time, _ = timed(lambda: uncached(key, rows), 3)
+        cached_time, _ = timed(lambda: metrics.distributions(key, rows), 3)
+        report(f"{len(metrics.columns)} behavior distributions, {size:,} rows", [
+            ("code columns, once", f"{build_time * 1000:9.1f} ms"),
+            (f"filtered, 8 value_counts ({len(rows):,} rows)", f"{pandas_time * 1000:9.1f} ms"),
+            (f"filtered, {len(metrics.columns)} crosstabs by severity", f"{split_time * 1000:9.1f} ms"),
+            ("all rows, one bincount", f"{all_time * 1000:9.1f} ms"),
+            ("filtered, one bincount", f"{filtered_time * 1000:9.1f} ms"),
+            ("filtered, cached", f"{cached_time * 1000:9.3f} ms"),
+        ])
+
+
+def bench_export(sizes=(15_100, 1_000_000)):
+    import tempfile
+
+    from export import EXPORT_FORMATS, Exporter
+
+    for size in sizes:
+        df = scaled_dataset(size)
+        filters = FilterEngine(df)
+        selections, age_range = _sample_selection(filters)
+        key = filters.canonical(selections, {"Biker_Age": age_range})
+        rows = filters.rows_for_key(key)
+        with tempfile.TemporaryDirectory() as directory:
+            exporter = Exporter(df, directory, version="bench")
+            eager_time, data = timed(lambda: df.to_csv(index=False).encode("utf-8"), 1)
+            result = [("eager to_csv on every rerun, all rows", f"{eager_time * 1000:9.1f} ms  {len(data) / 2**20:7.1f} MiB")]
+            for fmt in EXPORT_FORMATS:
+                def fresh():
+                    for name in os.listdir(directory):
+                        os.remove(os.path.join(directory, name))
+                    return exporter.path((), None, fmt)
+
+                write_time, path = timed(fresh, 1)
+                result.append((f"{fmt}, all rows, on click", f"{write_time * 1000:9.1f} ms  {os.path.getsize(path) / 2**20:7.1f} MiB"))
+            filtered_time, _ = timed(lambda: exporter.path(key, rows, "CSV"), 1)
+            reuse_time, _ = timed(lambda: exporter.path(key, rows, "CSV"), 5)
+            result += [
+                (f"CSV, filtered ({len(rows):,} rows), on click", f"{filtered_time * 1000:9.1f} ms"),
+                ("CSV, same filter state again", f"{reuse_time * 1000:9.3f} ms"),
+            ]
+            report(f"Filtered data export, {size:,} rows", result)
+
+
+def _read_and_correlate(path):
+    return pd.read_parquet(path).corr()
+
+
+def _peak_rss():
+    # VmHWM rather than ru_maxrss, which a spawned child inherits from its parent.
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+
+
+def _peak_growth(fn, *args):
+    """Growth of this process's peak RSS, in bytes, while fn(*args) runs (Linux)."""
+    before = _peak_rss()
+    fn(*args)
+    return _peak_rss() - before
+
+
+def bench_streaming(rows=2_000_000, batch_rows=(50_000, 200_000), workers=(1, 2)):
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from covariance import NUMERIC_COLUMNS, streaming_covariance
+
+    def peak(fn, *args):
+        # A fresh process per measurement, so earlier runs do not mask the peak.
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return pool.submit(_peak_growth, fn, *args).result()
+
+    df = scaled_dataset(rows)
+    # Knock out 1% of the values so pairwise-complete counts are exercised.
+    holes = np.random.default_rng(0).random((rows, len(NUMERIC_COLUMNS))) < 0.01
+    numeric = df[NUMERIC_COLUMNS].astype("float64").mask(holes)
+    with tempfile.TemporaryDirectory() as tmp:
+        parquet_path, csv_path = os.path.join(tmp, "data.parquet"), os.path.join(tmp, "data.csv")
+        pq.write_table(pa.Table.from_pandas(numeric, preserve_index=False), parquet_path, row_group_size=250_000)
+        numeric.to_csv(csv_path, index=False)
+
+        pandas_time, expected = timed(lambda: _read_and_correlate(parquet_path), 1)
+        pandas_peak = peak(_read_and_correlate, parquet_path)
+        result = [("read whole Parquet + DataFrame.corr", f"{pandas_time * 1000:8.1f} ms  +{pandas_peak / 2**20:6.1f} MiB RSS")]
+        error = 0.0
+        for path, label in [(parquet_path, "Parquet"), (csv_path, "CSV")]:
+            for size in batch_rows:
+                seconds, accumulator = timed(lambda: streaming_covariance(path, batch_rows=size), 1)
+                peak_bytes = peak(streaming_covariance, path, NUMERIC_COLUMNS, size)
+                error = max(error, float(np.nanmax(np.abs(accumulator.correlation() - expected.to_numpy()))))
+                result.append((f"{label}, {size:,}-row batches", f"{seconds * 1000:8.1f} ms  +{peak_bytes / 2**20:6.1f} MiB RSS"))
+        for n in workers[1:]:
+            seconds, accumulator = timed(lambda: streaming_covariance(parquet_path, workers=n), 1)
+            error = max(error, float(np.nanmax(np.abs(accumulator.correlation() - expected.to_numpy()))))
+            result.append((f"Parquet, {n} worker processes", f"{seconds * 1000:8.1f} ms"))
+        result.append(("max |streamed - pandas|", f"{error:8.1e}"))
+    report(f"streamed {len(NUMERIC_COLUMNS)}x{len(NUMERIC_COLUMNS)} correlation, {rows:,} rows, 1% missing", result)
+
+
+# --- CHART RENDERING ---
+def _advanced_charts(df):
+    """(args, kwargs) for render_png of each chart on the advanced page."""
+    from density import draw_violin_plot
+    from scatter import ScatterService, draw_scatter_plot
+    from sketch import draw_box_plot
+
+    sketches, densities, scatters = SketchStore(df), DensityService(df), ScatterService(df)
+    charts = [
+        ((draw_box_plot, col, group, False, (12, 7)), {"sketches": sketches.sketches(col, group)})
+        for col, group in BOX_PLOTS
+    ]
+    charts += [
+        ((draw_violin_plot, col, group, False, (12, 7)),
+         {"densities": densities.densities(col, group), "sketches": sketches.sketches(col, group)})
+        for col, group in VIOLIN_PLOTS
+    ]
+    for x, y, hue in [
+        ("Bike_Speed", "Daily_Travel_Distance", "Accident_Severity"),
+        ("Bike_Speed", "Biker_Age", None),
+        ("Daily_Travel_Distance", "Biker_Age", None),
+    ]:
+        charts.append(((draw_scatter_plot, x, y, False, (12, 8)), {"layer": scatters.layer(x, y, hue)}))
+    return [((draw, f"{col} by {group}", group, col, rotation, size), kwargs)
+            for (draw, col, group, rotation, size), kwargs in charts]
+
+
+def bench_render(workers=(1, 2, 4), rows=15_100):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from figures import render_png
+
+    charts = _advanced_charts(scaled_dataset(rows))
+    serial_time, _ = timed(lambda: [render_png(*args, **kwargs) for args, kwargs in charts], 1)
+    result = [("serial, pyplot-free Figure", f"{serial_time * 1000:8.1f} ms")]
+    for n in workers:
+        with ProcessPoolExecutor(n, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Warm the workers (imports, fonts) so only rendering is timed.
+            for future in [pool.submit(render_png, *args, **kwargs) for args, kwargs in charts[:n]]:
+                future.result()
+            seconds, _ = timed(lambda: [
+                future.result()
+                for future in [pool.submit(render_png, *args, **kwargs) for args, kwargs in charts]
+            ], 1)
+        result.append((f"process pool, {n} workers", f"{seconds * 1000:8.1f} ms"))
+    report(f"{len(charts)} advanced-page charts, {rows:,} rows, {os.cpu_count()} CPU(s)", result)
+
+
+SUITES = {
+    "source": bench_source,
+    "schema": bench_schema,
+    "filters": bench_filters,
+    "ranges": bench_ranges,
+    "cube": bench_cube,
+    "histograms": bench_histograms,
+    "sketches": bench_sketches,
+    "violins": bench_violins,
+    "scatter": bench_scatter,
+    "pairs": bench_pairs,
+    "correlation": bench_correlation,
+    "streaming": bench_streaming,
+    "association": bench_association,
+    "behavior": bench_behavior,
+    "export": bench_export,
+    "render": bench_render,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("suite", choices=sorted(SUITES) + ["all"])
+    args = parser.parse_args()
+    for name, suite in SUITES.items():
+        if args.suite in (name, "all"):
+            suite()
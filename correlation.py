@@ -1,6 +1,11 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from dataset import load_data
+from filters import current_filter_key, sidebar_filters
+from fragments import chart_fragment
+from covariance import filtered_correlation
+from association import CATEGORICAL_MEASURES, association_matrix
+from export import EXPORT_FORMATS, download_button, export_status
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -9,12 +14,6 @@ st.set_page_config(page_title="Motorbike Accident Insights Dashboard", page_icon
 
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
-    df = pd.read_csv(url)
-    return df
-
 df = load_data()
 
 
@@ -68,93 +67,10 @@ with st.sidebar:
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        severity = st.multiselect(
-            "Accident Severity",
-            options=sorted(df["Accident_Severity"].dropna().unique()),
-            default=sorted(df["Accident_Severity"].dropna().unique())
-        )
-
-        weather = st.multiselect(
-            "Weather Condition",
-            options=sorted(df["Weather"].dropna().unique()),
-            default=sorted(df["Weather"].dropna().unique())
-        )
-
-        time_of_day = st.multiselect(
-            "Time of Day",
-            options=sorted(df["Time_of_Day"].dropna().unique()),
-            default=sorted(df["Time_of_Day"].dropna().unique())
-        )
-
-        road_type = st.multiselect(
-            "Road Type",
-            options=sorted(df["Road_Type"].dropna().unique()),
-            default=sorted(df["Road_Type"].dropna().unique())
-        )
-
-        # --- Optional Filters ---
-        if "Biker_Alcohol" in df.columns:
-            alcohol = st.multiselect(
-                "Biker Alcohol Consumption",
-                options=sorted(df["Biker_Alcohol"].dropna().unique()),
-                default=sorted(df["Biker_Alcohol"].dropna().unique())
-            )
-        else:
-            alcohol = []
-
-        if "Traffic_Density" in df.columns:
-            traffic = st.multiselect(
-                "Traffic Density",
-                options=sorted(df["Traffic_Density"].dropna().unique()),
-                default=sorted(df["Traffic_Density"].dropna().unique())
-            )
-        else:
-            traffic = []
-
-        if "Valid_Driving_License" in df.columns:
-            license_status = st.multiselect(
-                "Valid Driving License",
-                options=sorted(df["Valid_Driving_License"].dropna().unique()),
-                default=sorted(df["Valid_Driving_License"].dropna().unique())
-            )
-        else:
-            license_status = []
-
-        # --- Numeric Filter: Biker Age ---
-        if "Biker_Age" in df.columns:
-            min_age, max_age = st.slider(
-                "Filter by Biker Age",
-                int(df["Biker_Age"].min()),
-                int(df["Biker_Age"].max()),
-                (int(df["Biker_Age"].min()), int(df["Biker_Age"].max()))
-            )
-        else:
-            min_age, max_age = None, None
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        if severity:
-            filtered_df = filtered_df[filtered_df["Accident_Severity"].isin(severity)]
-        if weather:
-            filtered_df = filtered_df[filtered_df["Weather"].isin(weather)]
-        if time_of_day:
-            filtered_df = filtered_df[filtered_df["Time_of_Day"].isin(time_of_day)]
-        if road_type:
-            filtered_df = filtered_df[filtered_df["Road_Type"].isin(road_type)]
-        if alcohol:
-            filtered_df = filtered_df[filtered_df["Biker_Alcohol"].isin(alcohol)]
-        if traffic:
-            filtered_df = filtered_df[filtered_df["Traffic_Density"].isin(traffic)]
-        if license_status:
-            filtered_df = filtered_df[filtered_df["Valid_Driving_License"].isin(license_status)]
-        if min_age is not None:
-            filtered_df = filtered_df[
-                (filtered_df["Biker_Age"] >= min_age) & (filtered_df["Biker_Age"] <= max_age)
-            ]
+        filtered_df = sidebar_filters(df)
 
     # --- Reset and Download Buttons ---
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
@@ -163,12 +79,8 @@ with st.sidebar:
             st.rerun()
 
     with col2:
-        st.download_button(
-            label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
-            file_name="motor_accident_data.csv",
-            mime="text/csv"
-        )
+        download_button(current_filter_key(), export_format)
+    export_status()
     st.markdown("---")
 
 # ===== THEME TOGGLE =====
@@ -196,8 +108,16 @@ color_theme = px.colors.qualitative.Pastel
 st.header("Correlation Insights")
 st.markdown("Explore feature interrelationships through correlation heatmaps.")
 
-numeric_cols = df.select_dtypes(include=['int', 'float']).columns
-corr = df[numeric_cols].corr()
+# Correlations of the filtered rows, from per-filter-cell cross products; the
+# matrix is cached by filter hash and the heatmap per filter state.
+def correlation_matrix():
+    return filtered_correlation(current_filter_key())
+
+@chart_fragment("correlation_heatmap")
+def correlation_heatmap(key):
+    return px.imshow(filtered_correlation(key), text_auto=True, title="Correlation Heatmap", aspect="auto", color_continuous_scale="Tealrose")
+
+corr = correlation_matrix()
 
 col1, col2 = st.columns(2)
 top_corr = corr.unstack().sort_values(ascending=False)
@@ -213,11 +133,27 @@ experience and alcohol use reflect safer patterns among trained riders.
 """)
 st.markdown("---")
 
-fig = px.imshow(corr, text_auto=True, title="Correlation Heatmap", aspect="auto", color_continuous_scale="Tealrose")
+fig = correlation_heatmap()
 st.plotly_chart(fig, use_container_width=True)
 st.success("""
 **Interpretation:** Bike speed and accident severity exhibit a strong positive correlation, confirming kinetic energy’s contribution to impact intensity.
 """)
+
+# --- ASSOCIATION MATRIX ---
+# Every column, categorical ones included, from one pass over coded rows:
+# Spearman between numeric columns, the correlation ratio between numeric
+# and categorical ones, and Cramér's V or Theil's U between categorical ones.
+measure = st.radio("Categorical Association", list(CATEGORICAL_MEASURES), horizontal=True)
+
+@chart_fragment("association_heatmap")
+def association_heatmap(key, categorical):
+    return px.imshow(association_matrix(key, categorical), text_auto=".2f", title="Association Matrix (All Columns)",
+                     aspect="auto", color_continuous_scale="Tealrose", zmin=-1, zmax=1, height=800)
+
+st.plotly_chart(association_heatmap(CATEGORICAL_MEASURES[measure]), use_container_width=True)
+st.success("""
+**Interpretation:** The number of vehicles involved and alcohol use are most strongly associated with accident severity, followed by talking or smoking while riding and licence status among the categorical factors.
+""")
     
 st.markdown("#### 💬 Observation")
 st.info("Higher correlations indicate stronger relationships between factors such as speed, experience, and accident severity.")
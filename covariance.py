@@ -0,0 +1,233 @@
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache import LRUCache
+from cube import FilterCells, get_filter_cells
+from dataset import load_data
+from datasource import BATCH_ROWS, iter_batches
+from filters import FILTER_CACHE_MB, filter_hash, get_filter_cache, get_filter_engine
+from schema import SCHEMA
+
+# Columns the declared schema stores as numbers: the ones DataFrame.corr reads.
+NUMERIC_COLUMNS = [col for col, dtype in SCHEMA.items() if isinstance(dtype, str) and dtype != "category"]
+
+
+class CrossProducts:
+    """Pairwise-complete sufficient statistics of a set of numeric columns.
+
+    Over the rows where columns i and j are both present, ``n[i, j]`` counts
+    them, ``sums[i, j]`` and ``squares[i, j]`` are the sums of column i and
+    of its squares, and ``products[i, j]`` is the sum of column i times
+    column j. Statistics of disjoint row sets add up, so partials merge.
+    """
+
+    def __init__(self, n, sums, squares, products):
+        self.n = n
+        self.sums = sums
+        self.squares = squares
+        self.products = products
+
+    @classmethod
+    def of(cls, values):
+        """Statistics of a (rows, columns) float array; NaN is missing."""
+        present = ~np.isnan(values)
+        mask = present.astype(np.float64)
+        values = np.where(present, values, 0.0)
+        return cls(mask.T @ mask, values.T @ mask, (values * values).T @ mask, values.T @ values)
+
+    def merge(self, other):
+        return CrossProducts(self.n + other.n, self.sums + other.sums,
+                             self.squares + other.squares, self.products + other.products)
+
+    def correlation(self, min_periods=1):
+        """Pearson correlation matrix, matching DataFrame.corr's pairwise NaN handling."""
+        n, sx, sy = self.n, self.sums, self.sums.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.products - sx * sy / n
+            var_x = self.squares - sx * sx / n
+            var_y = var_x.T
+            r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+            # A column constant over the pair's rows has no correlation; the
+            # tolerance absorbs rounding in sum-of-squares minus square-of-sum.
+            flat = (var_x <= 1e-12 * self.squares) | (var_y <= 1e-12 * self.squares.T)
+        r[flat | (n < max(min_periods, 1))] = np.nan
+        diagonal = np.diag_indices_from(r)
+        r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+        return r
+
+
+class CovarianceAccumulator:
+    """Streaming pairwise covariance of a set of numeric columns.
+
+    Each batch is reduced around its own column means, then folded into the
+    running state with Chan et al.'s parallel update (Welford's, a batch at a
+    time), so the state never holds rows and accumulators built in separate
+    processes merge exactly. Per pair of columns (i, j), over the rows where
+    both are present, it keeps the row count, the mean and squared
+    deviations of column i, and the co-moment.
+    """
+
+    def __init__(self, columns):
+        p = len(columns)
+        self.columns = list(columns)
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+
+    def update(self, values):
+        """Add a (rows, columns) batch; NaN is missing."""
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        mask = present.astype(np.float64)
+        counts = present.sum(axis=0)
+        centre = np.divide(np.where(present, values, 0.0).sum(axis=0), counts,
+                           out=np.zeros(values.shape[1]), where=counts > 0)
+        values = np.where(present, values - centre, 0.0)
+        batch = CovarianceAccumulator(self.columns)
+        batch.n = mask.T @ mask
+        sums = values.T @ mask
+        offset = np.divide(sums, batch.n, out=np.zeros_like(sums), where=batch.n > 0)
+        batch.mean = centre[:, None] + offset
+        batch.m2 = (values * values).T @ mask - sums * offset
+        batch.comoment = values.T @ values - sums * offset.T
+        self._absorb(batch)
+        return self
+
+    def merge(self, other):
+        """A new accumulator over the rows of both."""
+        merged = CovarianceAccumulator(self.columns)
+        merged.n, merged.mean, merged.m2, merged.comoment = self.n, self.mean, self.m2, self.comoment
+        merged._absorb(other)
+        return merged
+
+    def _absorb(self, other):
+        n = self.n + other.n
+        share = np.divide(other.n, n, out=np.zeros_like(n), where=n > 0)
+        delta = other.mean - self.mean
+        weight = self.n * share
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + other.m2 + delta * delta * weight
+        self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+        self.n = n
+
+    def covariance(self, ddof=1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.n > ddof, self.comoment / (self.n - ddof), np.nan)
+
+    def correlation(self, min_periods=1):
+        """Pearson correlation matrix, matching DataFrame.corr's pairwise NaN handling."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.clip(self.comoment / np.sqrt(self.m2 * self.m2.T), -1.0, 1.0)
+        r[(self.m2 <= 0) | (self.m2.T <= 0) | (self.n < max(min_periods, 1))] = np.nan
+        diagonal = np.diag_indices_from(r)
+        r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+        return r
+
+
+def _accumulate(path, columns, batch_rows, row_groups=None):
+    accumulator = CovarianceAccumulator(columns)
+    for batch in iter_batches(path, columns, batch_rows, row_groups):
+        accumulator.update(batch[columns].to_numpy(dtype="float64", na_value=np.nan))
+    return accumulator
+
+
+def streaming_covariance(path=None, columns=NUMERIC_COLUMNS, batch_rows=BATCH_ROWS, workers=1):
+    """CovarianceAccumulator over a CSV or Parquet file read batch by batch.
+
+    With several workers, each process reads its own share of a Parquet
+    file's row groups and the partial accumulators are merged; CSV files
+    are read by one process.
+    """
+    if workers <= 1 or not (path or "").endswith(".parquet"):
+        return _accumulate(path, columns, batch_rows)
+    import pyarrow.parquet as pq
+
+    groups = range(pq.ParquetFile(path).num_row_groups)
+    shares = [list(groups[i::workers]) for i in range(min(workers, len(groups)))]
+    with ProcessPoolExecutor(len(shares), mp_context=multiprocessing.get_context("spawn")) as pool:
+        partials = pool.map(_accumulate, [path] * len(shares), [columns] * len(shares),
+                            [batch_rows] * len(shares), shares)
+        result = CovarianceAccumulator(columns)
+        for partial in partials:
+            result = result.merge(partial)
+    return result
+
+
+class CorrelationEngine:
+    """Correlations of the numeric columns for any filter state.
+
+    Cross products are summed per filter cell once, so a multiselect-only
+    filter state is a sum over its cells (O(cells x columns^2), independent
+    of the row count) and only states with a numeric range revisit rows.
+    Values are centred on the column means first, which keeps the
+    sum-of-squares arithmetic accurate. No row-level copy is kept: rows are
+    converted to centred float64 a cell (or a filtered selection) at a time
+    from the frame's own compact columns.
+    """
+
+    def __init__(self, df, columns=None, cells=None, cache=None):
+        self.columns = list(df.select_dtypes(include="number").columns if columns is None else columns)
+        self.frame = df[self.columns]
+        self.means = self.frame.mean().to_numpy(dtype="float64")
+        self.cells = FilterCells(df) if cells is None else cells
+        self.partials = self._cell_partials()
+        self._results = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+
+    def _centred(self, rows):
+        return self.frame.take(rows).to_numpy(dtype="float64", na_value=np.nan) - self.means
+
+    def _cell_partials(self):
+        p = len(self.columns)
+        partials = [np.zeros((self.cells.size, p, p)) for _ in range(4)]
+        order = np.argsort(self.cells.cell, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(self.cells.cell, minlength=self.cells.size))])
+        for cell in np.flatnonzero(np.diff(bounds)):
+            stats = CrossProducts.of(self._centred(order[bounds[cell]:bounds[cell + 1]]))
+            for array, part in zip(partials, (stats.n, stats.sums, stats.squares, stats.products)):
+                array[cell] = part
+        return [array.reshape(self.cells.shape + (p, p)) for array in partials]
+
+    def stats(self, key=(), rows=None):
+        """CrossProducts of the rows a canonical filter key selects."""
+        if self.cells.covers(key):
+            return CrossProducts(*(self.cells.select(array, key) for array in self.partials))
+        return CrossProducts.of(self._centred(rows))
+
+    def correlation(self, key=(), rows=None):
+        """DataFrame.corr() of the filtered numeric columns, cached by filter hash."""
+        cache_key = ("correlation", filter_hash(key))
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            return cached
+        corr = pd.DataFrame(self.stats(key, rows).correlation(), index=self.columns, columns=self.columns)
+        self._results.put(cache_key, corr, corr.memory_usage().sum())
+        return corr
+
+
+@st.cache_resource(show_spinner=False)
+def get_correlation_engine():
+    return CorrelationEngine(load_data(), cells=get_filter_cells(), cache=get_filter_cache())
+
+
+def filtered_correlation(key):
+    """Correlation matrix of the numeric columns for a canonical filter key."""
+    engine = get_correlation_engine()
+    rows = None if engine.cells.covers(key) else get_filter_engine().rows_for_key(key)
+    return engine.correlation(key, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correlation matrix of the numeric columns, read in batches.")
+    parser.add_argument("path", nargs="?", help="CSV or Parquet file (default: the dataset)")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="processes for Parquet row groups")
+    args = parser.parse_args()
+    accumulator = streaming_covariance(args.path, batch_rows=args.batch_rows, workers=args.workers)
+    columns = accumulator.columns
+    print(pd.DataFrame(accumulator.correlation(), index=columns, columns=columns).round(4).to_string())
@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dataset import load_data
+from filters import CATEGORY_FILTERS, get_filter_cache, get_filter_engine
+from schema import SEVERITY_ORDER
+
+# Categorical dimensions charted against Accident_Severity on the factor pages.
+FACTOR_COLUMNS = [
+    "Biker_Occupation", "Biker_Education_Level",
+    "Wearing_Helmet", "Motorcycle_Ownership", "Valid_Driving_License",
+    "Bike_Condition", "Road_Type", "Road_condition", "Weather",
+    "Time_of_Day", "Traffic_Density", "Biker_Alcohol",
+]
+
+
+def category_codes(series):
+    """Integer codes (-1 for missing) and the label for each code."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, np.asarray(uniques).tolist()
+
+
+class FilterCells:
+    """Rows grouped by their combination of sidebar multiselect values.
+
+    A filter state without numeric ranges selects whole cells, so any
+    additive per-cell statistic (counts, sums, sketches) answers it by
+    summing the selected cells.
+    """
+
+    def __init__(self, df):
+        self.dims = [col for col, _ in CATEGORY_FILTERS if col in df.columns]
+        self.labels = {}
+        coded = []
+        for col in self.dims:
+            codes, labels = category_codes(df[col])
+            self.labels[col] = labels
+            # Missing values get their own slot, which any filter drops.
+            coded.append((codes, len(labels), len(labels) + int((codes < 0).any())))
+        self.shape = tuple(slots for _, _, slots in coded)
+        self.size = int(np.prod(self.shape))
+        # One cell id per row, shared by every per-cell service (see get_filter_cells).
+        dtype = np.int32 if self.size < 2**31 else np.int64
+        cell = np.zeros(len(df), dtype=dtype)
+        for codes, missing, slots in coded:
+            cell = cell * slots + np.where(codes < 0, missing, codes).astype(dtype)
+        self.cell = cell
+
+    def covers(self, key):
+        """Whether a canonical filter key selects whole cells (no numeric ranges)."""
+        return all(col in self.labels for col, _ in key)
+
+    def select(self, per_cell, key):
+        """Sum over the cells key selects of per_cell, shaped (*cells, ...)."""
+        for col, selected in key:
+            keep = [i for i, label in enumerate(self.labels[col]) if label in set(selected)]
+            per_cell = np.take(per_cell, keep, axis=self.dims.index(col))
+        return per_cell.reshape((-1,) + per_cell.shape[len(self.dims):]).sum(axis=0)
+
+
+class CountCube:
+    """Dense row counts over every combination of coded dimensions.
+
+    Axis i of ``counts`` is ``dims[i]`` and position j on that axis is
+    ``labels[dims[i]][j]``. Any marginal or filtered slice is a sum over axes.
+    """
+
+    def __init__(self, dims, labels, counts):
+        self.dims = list(dims)
+        self.labels = labels
+        self.counts = counts
+        self._tables = {}
+
+    def slice(self, selections):
+        """Sub-cube keeping only the selected labels of each filtered dimension."""
+        counts = self.counts
+        labels = dict(self.labels)
+        for col, selected in selections.items():
+            if col not in labels:
+                continue
+            keep = [i for i, label in enumerate(labels[col]) if label in set(selected)]
+            counts = np.take(counts, keep, axis=self.dims.index(col))
+            labels[col] = [labels[col][i] for i in keep]
+        return CountCube(self.dims, labels, counts)
+
+    def marginal(self, *cols):
+        """Counts summed over every dimension not listed, axes in cols order."""
+        axes = [self.dims.index(col) for col in cols]
+        others = tuple(i for i in range(len(self.dims)) if i not in axes)
+        summed = self.counts.sum(axis=others)
+        # sum() keeps the remaining axes in cube order; reorder to match cols.
+        return np.transpose(summed, [sorted(axes).index(axis) for axis in axes])
+
+    def crosstab(self, col, by="Accident_Severity"):
+        """Long-format (col, by, Count) table like groupby([col, by]).size()."""
+        table = self._tables.get((col, by))
+        if table is None:
+            table = crosstab_frame(col, self.labels[col], by, self.labels[by], self.marginal(col, by))
+            self._tables[(col, by)] = table
+        return table.copy(deep=False)
+
+    def crosstabs(self, cols, by="Accident_Severity"):
+        return {col: self.crosstab(col, by) for col in cols}
+
+
+def crosstab_frame(col, col_labels, by, by_labels, table):
+    rows, cols = np.nonzero(table)
+    by_values = np.asarray(by_labels, dtype=object)[cols]
+    if by == "Accident_Severity":
+        by_values = pd.Categorical(by_values, categories=SEVERITY_ORDER, ordered=True)
+    return pd.DataFrame({
+        col: np.asarray(col_labels, dtype=object)[rows],
+        by: by_values,
+        "Count": table[rows, cols],
+    })
+
+
+class CubeBuilder:
+    """Codes the cube dimensions once so any row subset is one bincount away."""
+
+    def __init__(self, df, dims=FACTOR_COLUMNS, by="Accident_Severity"):
+        self.dims = [col for col in dims if col in df.columns] + [by]
+        self.by = by
+        self.labels = {}
+        codes = []
+        for col in self.dims:
+            series = df[col]
+            if col == "Accident_Severity":
+                # Always the full ordered severity axis, even if a level is unused.
+                series = series.astype(pd.CategoricalDtype(SEVERITY_ORDER, ordered=True))
+            col_codes, self.labels[col] = category_codes(series)
+            codes.append(col_codes)
+        self.shape = tuple(len(self.labels[col]) for col in self.dims)
+        # One narrow (rows x dims) code matrix; -1 marks a missing value.
+        code_type = np.int8 if max(self.shape) < 128 else np.int16
+        self.codes = np.column_stack(codes).astype(code_type)
+        # Row-major cell index into the cube. Rows with a missing dimension
+        # get -1 and are dropped, as groupby() would.
+        flat = np.zeros(len(df), dtype=np.int32)
+        missing = np.zeros(len(df), dtype=bool)
+        for col_codes, size in zip(codes, self.shape):
+            flat *= size
+            flat += col_codes
+            missing |= col_codes < 0
+        flat[missing] = -1
+        self.flat = flat
+        self.base = self.build()
+
+    def build(self, rows=None):
+        flat = self.flat if rows is None else self.flat[rows]
+        counts = np.bincount(flat[flat >= 0], minlength=int(np.prod(self.shape)))
+        return CountCube(self.dims, self.labels, counts.reshape(self.shape))
+
+    def crosstabs(self, rows=None, chunk_rows=1 << 20):
+        """Every (dim x by) table from one bincount pass over the code matrix.
+
+        Each row contributes one combined code per dimension,
+        ``offset[dim] + code[dim] * len(by) + code[by]``, so a single
+        bincount fills all the tables at once. Rows are processed in chunks to
+        bound the size of the combined-code buffer.
+        """
+        cols = self.dims[:-1]
+        n_by = self.shape[-1]
+        sizes = np.array(self.shape[:-1], dtype=np.int64) * n_by
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+        total = int(sizes.sum())
+        counts = np.zeros(total + 1, dtype=np.int64)
+        n = len(self.codes) if rows is None else len(rows)
+        for start in range(0, n, chunk_rows):
+            stop = min(start + chunk_rows, n)
+            block = self.codes[start:stop] if rows is None else self.codes[rows[start:stop]]
+            dims = block[:, :-1].astype(np.int32)
+            by = block[:, -1:].astype(np.int32)
+            cells = offsets + dims * n_by + by
+            # Missing values land in the extra slot past the last table.
+            cells[(dims < 0) | (by < 0)] = total
+            counts += np.bincount(cells.ravel(), minlength=total + 1)
+        return {
+            col: crosstab_frame(
+                col, self.labels[col], self.by, self.labels[self.by],
+                counts[offset:offset + size].reshape(-1, n_by),
+            )
+            for col, offset, size in zip(cols, offsets, sizes)
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_filter_cells():
+    return FilterCells(load_data())
+
+
+@st.cache_resource(show_spinner=False)
+def get_cube_builder():
+    return CubeBuilder(load_data())
+
+
+def filtered_cube(key):
+    """Count cube for a canonical filter key (see FilterEngine.canonical)."""
+    builder = get_cube_builder()
+    if not key:
+        return builder.base
+    cache = get_filter_cache()
+    cube = cache.get(("cube", key))
+    if cube is None:
+        if all(col in builder.labels for col, _ in key):
+            cube = builder.base.slice(dict(key))
+        else:
+            # Numeric ranges are not cube dimensions: count the filtered rows.
+            cube = builder.build(get_filter_engine().rows_for_key(key))
+        cache.put(("cube", key), cube, cube.counts.nbytes)
+    return cube
+
+
+def factor_tables(key):
+    """Every (factor column x Accident_Severity) count table for a filter key."""
+    builder = get_cube_builder()
+    if all(col in builder.labels for col, _ in key):
+        return filtered_cube(key).crosstabs(FACTOR_COLUMNS)
+    # Numeric ranges: one single-pass crosstab over the filtered row ids.
+    cache = get_filter_cache()
+    tables = cache.get(("factor_tables", key))
+    if tables is None:
+        tables = builder.crosstabs(get_filter_engine().rows_for_key(key))
+        cache.put(("factor_tables", key), tables, sum(t.memory_usage(deep=True).sum() for t in tables.values()))
+    return {col: table.copy(deep=False) for col, table in tables.items()}
@@ -0,0 +1,29 @@
+import streamlit as st
+import pandas as pd
+from datasource import read_dataset
+
+# Pages get shallow views of one shared frame; with copy-on-write a page that
+# assigns into its view gets a private copy instead of editing the shared one.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# --- SHARED DATASET ---
+# st.cache_resource keeps a single object per server process, unlike
+# st.cache_data which is keyed per function and hands every caller a fresh
+# unpickled copy. All pages import load_data() from here.
+@st.cache_resource(show_spinner="Loading dataset...")
+def _load_base():
+    return read_dataset()
+
+
+def load_data():
+    """Return a shallow copy of the process-wide dataset.
+
+    The copy shares its column data with every other session's. Adding or
+    dropping columns only changes this copy; writing into existing values
+    (``df.loc[...] = ...``, ``inplace=True``) is safe only under
+    copy-on-write, which pandas 3 always uses and this module enables on
+    older versions.
+    """
+    return _load_base().copy(deep=False)
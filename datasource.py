@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import urllib.request
+
+import pandas as pd
+
+from schema import SCHEMA, apply_schema
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "motor_accident.csv")
+CSV_URL = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
+
+# Local columnar snapshot of motor_accident.csv (not committed, see .gitignore).
+SNAPSHOT_DIR = os.environ.get("SV25_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, "motor_accident.parquet")
+MANIFEST_PATH = os.path.join(SNAPSHOT_DIR, "motor_accident.json")
+# Changing the declared schema invalidates snapshots written with the old one.
+SCHEMA_TAG = hashlib.sha256(repr(sorted(SCHEMA.items())).encode()).hexdigest()[:16]
+# Rows per batch when streaming the dataset instead of loading it whole.
+BATCH_ROWS = int(os.environ.get("SV25_BATCH_ROWS", "100000"))
+
+
+# --- SOURCE CSV ---
+def _ensure_csv():
+    # Only hosts without a checkout of the CSV ever touch the network.
+    if not os.path.exists(CSV_PATH):
+        # Each process downloads to its own file and renames it into place,
+        # so no reader ever sees a partial CSV.
+        tmp = f"{CSV_PATH}.{os.getpid()}.tmp"
+        try:
+            urllib.request.urlretrieve(CSV_URL, tmp)
+            os.replace(tmp, CSV_PATH)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return CSV_PATH
+
+
+def content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- SNAPSHOT MANIFEST ---
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def _snapshot_is_fresh(csv_path, manifest):
+    if not os.path.exists(SNAPSHOT_PATH) or manifest.get("schema") != SCHEMA_TAG:
+        return False
+    stat = os.stat(csv_path)
+    # Size and mtime unchanged: skip re-hashing the source.
+    if manifest.get("size") == stat.st_size and manifest.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if manifest.get("sha256") != content_hash(csv_path):
+        return False
+    manifest.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    _write_manifest(manifest)
+    return True
+
+
+def build_snapshot(csv_path=None):
+    """Convert the CSV into the typed Parquet snapshot and record its content hash."""
+    csv_path = csv_path or _ensure_csv()
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    stat = os.stat(csv_path)
+    df = apply_schema(pd.read_csv(csv_path))
+    tmp = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, SNAPSHOT_PATH)
+    _write_manifest({
+        "sha256": content_hash(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "rows": len(df),
+        "schema": SCHEMA_TAG,
+    })
+    return df
+
+
+# --- READERS ---
+def read_remote_csv():
+    return pd.read_csv(CSV_URL)
+
+
+def read_local_csv():
+    return pd.read_csv(_ensure_csv())
+
+
+def read_snapshot():
+    return pd.read_parquet(SNAPSHOT_PATH)
+
+
+def iter_batches(path=None, columns=None, batch_rows=BATCH_ROWS, row_groups=None):
+    """Yield typed DataFrames of at most batch_rows rows of a CSV or Parquet file.
+
+    Without a path this streams the snapshot if it is fresh and the CSV
+    otherwise. Memory is bounded by the batch size, not the file size (for
+    Parquet, by the larger of a batch and a row group). row_groups limits a
+    Parquet read to those row groups.
+    """
+    if path is None:
+        csv_path = _ensure_csv()
+        path = SNAPSHOT_PATH if _snapshot_is_fresh(csv_path, _read_manifest()) else csv_path
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_rows, row_groups=row_groups, columns=columns)
+        for batch in batches:
+            yield apply_schema(batch.to_pandas())
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=batch_rows):
+            yield apply_schema(chunk)
+
+
+def dataset_version():
+    """Schema tag plus source content hash of the current snapshot, for keying derived artifacts."""
+    manifest = _read_manifest()
+    return f"{manifest.get('schema', SCHEMA_TAG)}-{manifest.get('sha256', '')[:16]}"
+
+
+def read_dataset():
+    """Read the dataset from the local snapshot, rebuilding it if the CSV changed."""
+    csv_path = _ensure_csv()
+    if _snapshot_is_fresh(csv_path, _read_manifest()):
+        return apply_schema(read_snapshot())
+    return build_snapshot(csv_path)
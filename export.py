@@ -0,0 +1,322 @@
+import contextlib
+import functools
+import glob
+import gzip
+import io
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+
+import streamlit as st
+
+from dataset import load_data
+from datasource import SNAPSHOT_DIR, dataset_version, read_dataset
+from filters import filter_hash, get_filter_engine
+from pools import spawn_pool
+
+# Generated exports, one file per dataset version, filter state and format.
+EXPORT_DIR = os.environ.get("SV25_EXPORT_DIR", os.path.join(SNAPSHOT_DIR, "exports"))
+# Oldest exports are deleted once the directory holds more than this, in MiB.
+EXPORT_SPOOL_MB = int(os.environ.get("SV25_EXPORT_SPOOL_MB", "512"))
+# Rows serialized per step, which bounds the memory an export needs.
+EXPORT_CHUNK_ROWS = int(os.environ.get("SV25_EXPORT_CHUNK_ROWS", "100000"))
+# Selections larger than this are exported by a background worker process.
+EXPORT_BACKGROUND_ROWS = int(os.environ.get("SV25_EXPORT_BACKGROUND_ROWS", "500000"))
+# Worker processes, and most exports queued or running at once.
+EXPORT_WORKERS = int(os.environ.get("SV25_EXPORT_WORKERS", "1"))
+EXPORT_QUEUE_SIZE = int(os.environ.get("SV25_EXPORT_QUEUE", "4"))
+
+
+def _open_zstd(path):
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+
+
+def _write_csv(path, chunks, opener=None):
+    raw = opener(path) if opener else open(path, "wb")
+    with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=i == 0)
+
+
+def _write_arrow(path, chunks, parquet):
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                if parquet:
+                    import pyarrow.parquet as pq
+
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    writer = pa.ipc.new_file(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _zstd_available():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Label: (file extension, MIME type, writer(path, chunks)). zstd is offered
+# when the optional zstandard package is installed.
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", _write_csv),
+    "CSV (gzip)": ("csv.gz", "application/gzip", lambda path, chunks: _write_csv(path, chunks, lambda p: gzip.open(p, "wb", compresslevel=6))),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", lambda path, chunks: _write_arrow(path, chunks, True)),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file", lambda path, chunks: _write_arrow(path, chunks, False)),
+}
+if _zstd_available():
+    EXPORT_FORMATS["CSV (zstd)"] = ("csv.zst", "application/zstd", lambda path, chunks: _write_csv(path, chunks, _open_zstd))
+
+
+class Exporter:
+    """Files of the filtered rows, written on demand and reused.
+
+    An export is written a chunk of rows at a time to a temporary file and
+    renamed into place, so readers never see a partial file. Its name holds
+    the dataset version and the filter hash, so the same filter state in any
+    session reuses it until the dataset changes.
+    """
+
+    def __init__(self, df, directory=EXPORT_DIR, version=None, spool_bytes=EXPORT_SPOOL_MB * 2**20):
+        self.df = df
+        self.directory = directory
+        self.version = version or dataset_version()
+        self.spool_bytes = spool_bytes
+
+    def file_name(self, key, fmt):
+        return f"motor_accident_data-{self.version}-{filter_hash(key)}.{EXPORT_FORMATS[fmt][0]}"
+
+    def spool_path(self, key, fmt):
+        return os.path.join(self.directory, self.file_name(key, fmt))
+
+    def chunks(self, rows=None, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+        """Frames of at most chunk_rows rows; progress(rows written) follows each one."""
+        n = len(self.df) if rows is None else len(rows)
+        for start in range(0, max(n, 1), chunk_rows):
+            if rows is None:
+                yield self.df.iloc[start:start + chunk_rows]
+            else:
+                yield self.df.take(rows[start:start + chunk_rows])
+            if progress is not None:
+                progress(min(start + chunk_rows, n))
+
+    def path(self, key=(), rows=None, fmt="CSV", progress=None):
+        """Path of the export of the rows a filter key selects, writing it if missing."""
+        path = self.spool_path(key, fmt)
+        try:
+            # Mark it recently used, so pruning keeps it.
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            EXPORT_FORMATS[fmt][2](tmp, self.chunks(rows, progress=progress))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._prune(keep=path)
+        return path
+
+    def _prune(self, keep):
+        """Delete the least recently used exports beyond the spool budget."""
+        files = []
+        for p in glob.glob(os.path.join(self.directory, "motor_accident_data-*")):
+            with contextlib.suppress(FileNotFoundError):
+                files.append((os.stat(p), p))
+        total = sum(stat.st_size for stat, _ in files)
+        # Another session may be pruning too, or reading a file removed here
+        # (on POSIX an open file stays readable after unlinking).
+        for stat, p in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.spool_bytes:
+                break
+            if p != keep:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(p)
+                total -= stat.st_size
+
+
+# --- BACKGROUND JOBS ---
+def _init_worker(progress, directory, version):
+    global _worker_exporter, _worker_progress
+    # Each worker process reads the dataset once and serves every job after.
+    _worker_exporter = Exporter(read_dataset(), directory, version)
+    _worker_progress = progress
+
+
+def _run_job(job_id, key, rows, fmt):
+    return _worker_exporter.path(key, rows, fmt, progress=lambda done: _worker_progress.put((job_id, done)))
+
+
+class ExportQueue:
+    """Exports written by a pool of worker processes, off the script thread.
+
+    Workers write to the same spool directory as Exporter.path, so a
+    finished job is also what the direct Download button reuses. A job is
+    identified by its file name: submitting the same filter state and format
+    again returns the existing job. At most ``size`` jobs are queued or
+    running at once; further submissions are refused. Workers report the
+    rows written after each chunk on a queue that status() drains.
+    """
+
+    def __init__(self, exporter, workers=EXPORT_WORKERS, size=EXPORT_QUEUE_SIZE):
+        self.exporter = exporter
+        self.size = size
+        self.jobs = {}
+        self._progress = multiprocessing.get_context("spawn").Queue()
+        self._pool = spawn_pool(workers, _init_worker, (self._progress, exporter.directory, exporter.version))
+        self._lock = threading.Lock()
+
+    def submit(self, key=(), rows=None, fmt="CSV"):
+        """Queue an export and return its job id, or None when the queue is full."""
+        job_id = self.exporter.file_name(key, fmt)
+        with self._lock:
+            job = self.jobs.get(job_id)
+            # A failed job, or a finished one whose file the spool pruning
+            # has deleted since, is written again.
+            if job is not None and (job["state"] in ("queued", "running")
+                                    or job["state"] == "done" and os.path.exists(job["path"])):
+                return job_id
+            if sum(job["state"] in ("queued", "running") for job in self.jobs.values()) >= self.size:
+                return None
+            self._forget_finished()
+            self.jobs[job_id] = {
+                "state": "queued", "format": fmt, "rows": 0, "total": len(self.exporter.df) if rows is None else len(rows),
+                "path": None, "error": None,
+            }
+        future = self._pool.submit(_run_job, job_id, key, rows, fmt)
+        future.add_done_callback(functools.partial(self._finish, job_id))
+        return job_id
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self.jobs[job_id]
+            if future.exception() is None:
+                job.update(state="done", path=future.result(), rows=job["total"])
+            else:
+                job.update(state="failed", error=str(future.exception()))
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["state"] in ("done", "failed")]
+        for job_id in finished[:max(len(self.jobs) - 4 * self.size, 0)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id):
+        """A copy of a job's state, rows written and total, or None for an unknown job."""
+        with self._lock:
+            while True:
+                try:
+                    updated, done = self._progress.get_nowait()
+                except queue.Empty:
+                    break
+                job = self.jobs.get(updated)
+                if job is not None and job["state"] in ("queued", "running"):
+                    job.update(state="running", rows=done)
+            job = self.jobs.get(job_id)
+            return None if job is None else dict(job)
+
+
+@st.cache_resource(show_spinner=False)
+def get_exporter():
+    return Exporter(load_data())
+
+
+@st.cache_resource(show_spinner=False)
+def get_export_queue():
+    return ExportQueue(get_exporter())
+
+
+def export_file(key, fmt="CSV"):
+    """Path of the export of a canonical filter key's rows in the given format."""
+    rows = get_filter_engine().rows_for_key(key)
+    return get_exporter().path(key, rows, fmt)
+
+
+def _reader(path_of):
+    def read():
+        with open(path_of(), "rb") as f:
+            return f.read()
+    return read
+
+
+def download_button(key, fmt="CSV", label="Download"):
+    """Sidebar download button that writes (or reuses) the export only when clicked.
+
+    Selections above EXPORT_BACKGROUND_ROWS rows that have no export yet get
+    a button that queues a background job instead; export_status() shows it.
+    """
+    extension, mime, _ = EXPORT_FORMATS[fmt]
+    rows = get_filter_engine().rows_for_key(key)
+    exporter = get_exporter()
+    n = len(exporter.df) if rows is None else len(rows)
+    if n > EXPORT_BACKGROUND_ROWS and not os.path.exists(exporter.spool_path(key, fmt)):
+        if not st.button("Prepare " + label):
+            return False
+        job_id = get_export_queue().submit(key, rows, fmt)
+        if job_id is None:
+            st.toast("Too many exports are running; try again shortly.")
+        elif job_id not in st.session_state.setdefault("export_jobs", []):
+            st.session_state["export_jobs"].append(job_id)
+        return False
+    return st.download_button(label=label, data=_reader(lambda: export_file(key, fmt)),
+                              file_name=f"motor_accident_data.{extension}", mime=mime)
+
+
+def _export_jobs(polling):
+    export_queue = get_export_queue()
+    pending = False
+    for job_id in list(st.session_state.get("export_jobs", [])):
+        job = export_queue.status(job_id)
+        if job is None:
+            continue
+        if job["state"] == "done" and not os.path.exists(job["path"]):
+            # Pruned from the spool since it finished; the sidebar offers
+            # to prepare it again.
+            st.session_state["export_jobs"].remove(job_id)
+            continue
+        pending |= job["state"] in ("queued", "running")
+        fmt = job["format"]
+        if job["state"] == "done":
+            st.download_button(label=f"Download {fmt} ({job['total']:,} rows)", data=_reader(lambda path=job["path"]: path),
+                               file_name=f"motor_accident_data.{EXPORT_FORMATS[fmt][0]}",
+                               mime=EXPORT_FORMATS[fmt][1], key=f"export-{job_id}")
+        elif job["state"] == "failed":
+            st.error(f"{fmt} export failed: {job['error']}")
+        else:
+            st.progress(job["rows"] / max(job["total"], 1),
+                        text=f"{fmt} export {job['state']}: {job['rows']:,} of {job['total']:,} rows")
+    if polling and not pending:
+        # Every job has finished: rerun the whole page, which draws this
+        # fragment again without run_every and so stops the polling.
+        st.rerun()
+
+
+def export_status():
+    """This session's background exports: progress while running, then a download button.
+
+    Polls once a second, as a fragment, only while a job is unfinished, so
+    the rest of the page does not rerun.
+    """
+    jobs = st.session_state.get("export_jobs", [])
+    if not jobs:
+        return
+    export_queue = get_export_queue()
+    pending = any((export_queue.status(job_id) or {}).get("state") in ("queued", "running") for job_id in jobs)
+    st.fragment(_export_jobs, run_every=1.0 if pending else None)(pending)
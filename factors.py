@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from dataset import load_data
+from filters import current_filter_key, sidebar_filters
+from cube import factor_tables
+from fragments import chart_fragment
+from export import EXPORT_FORMATS, download_button, export_status
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -9,12 +14,6 @@ st.set_page_config(page_title="Motorbike Accident Insights Dashboard", page_icon
 
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
-    df = pd.read_csv(url)
-    return df
-
 df = load_data()
 
 
@@ -68,93 +67,10 @@ with st.sidebar:
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        severity = st.multiselect(
-            "Accident Severity",
-            options=sorted(df["Accident_Severity"].dropna().unique()),
-            default=sorted(df["Accident_Severity"].dropna().unique())
-        )
-
-        weather = st.multiselect(
-            "Weather Condition",
-            options=sorted(df["Weather"].dropna().unique()),
-            default=sorted(df["Weather"].dropna().unique())
-        )
-
-        time_of_day = st.multiselect(
-            "Time of Day",
-            options=sorted(df["Time_of_Day"].dropna().unique()),
-            default=sorted(df["Time_of_Day"].dropna().unique())
-        )
-
-        road_type = st.multiselect(
-            "Road Type",
-            options=sorted(df["Road_Type"].dropna().unique()),
-            default=sorted(df["Road_Type"].dropna().unique())
-        )
-
-        # --- Optional Filters ---
-        if "Biker_Alcohol" in df.columns:
-            alcohol = st.multiselect(
-                "Biker Alcohol Consumption",
-                options=sorted(df["Biker_Alcohol"].dropna().unique()),
-                default=sorted(df["Biker_Alcohol"].dropna().unique())
-            )
-        else:
-            alcohol = []
-
-        if "Traffic_Density" in df.columns:
-            traffic = st.multiselect(
-                "Traffic Density",
-                options=sorted(df["Traffic_Density"].dropna().unique()),
-                default=sorted(df["Traffic_Density"].dropna().unique())
-            )
-        else:
-            traffic = []
-
-        if "Valid_Driving_License" in df.columns:
-            license_status = st.multiselect(
-                "Valid Driving License",
-                options=sorted(df["Valid_Driving_License"].dropna().unique()),
-                default=sorted(df["Valid_Driving_License"].dropna().unique())
-            )
-        else:
-            license_status = []
-
-        # --- Numeric Filter: Biker Age ---
-        if "Biker_Age" in df.columns:
-            min_age, max_age = st.slider(
-                "Filter by Biker Age",
-                int(df["Biker_Age"].min()),
-                int(df["Biker_Age"].max()),
-                (int(df["Biker_Age"].min()), int(df["Biker_Age"].max()))
-            )
-        else:
-            min_age, max_age = None, None
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        if severity:
-            filtered_df = filtered_df[filtered_df["Accident_Severity"].isin(severity)]
-        if weather:
-            filtered_df = filtered_df[filtered_df["Weather"].isin(weather)]
-        if time_of_day:
-            filtered_df = filtered_df[filtered_df["Time_of_Day"].isin(time_of_day)]
-        if road_type:
-            filtered_df = filtered_df[filtered_df["Road_Type"].isin(road_type)]
-        if alcohol:
-            filtered_df = filtered_df[filtered_df["Biker_Alcohol"].isin(alcohol)]
-        if traffic:
-            filtered_df = filtered_df[filtered_df["Traffic_Density"].isin(traffic)]
-        if license_status:
-            filtered_df = filtered_df[filtered_df["Valid_Driving_License"].isin(license_status)]
-        if min_age is not None:
-            filtered_df = filtered_df[
-                (filtered_df["Biker_Age"] >= min_age) & (filtered_df["Biker_Age"] <= max_age)
-            ]
+        filtered_df = sidebar_filters(df)
 
     # --- Reset and Download Buttons ---
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
@@ -163,12 +79,8 @@ with st.sidebar:
             st.rerun()
 
     with col2:
-        st.download_button(
-            label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
-            file_name="motor_accident_data.csv",
-            mime="text/csv"
-        )
+        download_button(current_filter_key(), export_format)
+    export_status()
     st.markdown("---")
 
 # ===== THEME TOGGLE =====
@@ -211,9 +123,13 @@ filtered_df["Accident_Severity"] = pd.Categorical(
     
 # Summary
 col1, col2, col3 = st.columns(3)
-top_severity = filtered_df['Accident_Severity'].mode()[0]
-top_weather = filtered_df['Weather'].mode()[0]
-top_road = filtered_df['Road_Type'].mode()[0]
+# mode() of an empty selection has no first entry.
+if filtered_df.empty:
+    top_severity = top_weather = top_road = "n/a"
+else:
+    top_severity = filtered_df['Accident_Severity'].mode()[0]
+    top_weather = filtered_df['Weather'].mode()[0]
+    top_road = filtered_df['Road_Type'].mode()[0]
 col1.metric("Most Common Severity", top_severity, border=True)
 col2.metric("Common Weather", top_weather, border=True)
 col3.metric("Frequent Road Type", top_road, border=True)
@@ -229,36 +145,24 @@ categorical trends allows targeted interventions to improve safety.
 st.markdown("---")
 
 # --- OCCUPATION ---
-agg_occ = (
-    filtered_df.groupby(["Biker_Occupation", "Accident_Severity"])
-    .size()
-    .reset_index(name="Count")
-)
-fig4 = px.bar(
-    agg_occ,
-    x="Biker_Occupation",
-    y="Count",
-    color="Accident_Severity",
-    title="Accident Severity by Biker Occupation",
-    color_discrete_sequence=color_theme,
-    barmode="group"
-)
+# Every factor table below comes from one aggregation call per filter state,
+# and each bar chart is built once per filter state.
+@chart_fragment("factor_bars")
+def factor_bars(key, col):
+    return px.bar(
+        factor_tables(key)[col],
+        x=col,
+        y="Count",
+        color="Accident_Severity",
+        title=f"Accident Severity by {col.replace('_', ' ')}",
+        color_discrete_sequence=color_theme,
+        barmode="group"
+    )
+
+fig4 = factor_bars("Biker_Occupation")
 
 # --- EDUCATION ---
-agg_edu = (
-    filtered_df.groupby(["Biker_Education_Level", "Accident_Severity"])
-    .size()
-    .reset_index(name="Count")
-)
-fig5 = px.bar(
-    agg_edu,
-    x="Biker_Education_Level",
-    y="Count",
-    color="Accident_Severity",
-    title="Accident Severity by Biker Education Level",
-    color_discrete_sequence=color_theme,
-    barmode="group"
-)
+fig5 = factor_bars("Biker_Education_Level")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -294,43 +198,43 @@ filtered_df["Accident_Severity"] = pd.Categorical(
 filtered_df["Accident_Severity"], categories=severity_order, ordered=True
 )
 
+@chart_fragment("factor_severity_bars")
+def severity_bars(key, col):
+    agg_df = factor_tables(key)[col].sort_values("Count", ascending=False)
+
+    fig = px.bar(
+        agg_df,
+        x=col,
+        y="Count",
+        color="Accident_Severity",
+        title=f"Accident Severity by {col.replace('_', ' ')}",
+        color_discrete_map=severity_colors_map,
+        category_orders={"Accident_Severity": severity_order},
+        barmode="group"
+    )
+
+    # Force bars to use fully solid fill (no shading or transparency)
+    fig.for_each_trace(lambda t: t.update(marker=dict(line=dict(width=0), opacity=1.0)))
+
+    # Remove the default Plotly gradient shading
+    fig.update_traces(marker_coloraxis=None)
+
+    # Force consistent flat color rendering
+    fig.update_layout(
+        template=None,  # remove plotly's default style template
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        bargap=0.25,
+    )
+    return fig
+
 # Display 2 charts per row
 for i in range(0, len(categorical_cols), 2):
     col1, col2 = st.columns(2)
 
     for j, col in enumerate(categorical_cols[i:i+2]):
             
-        agg_df = (
-            filtered_df.groupby([col, "Accident_Severity"])
-            .size()
-            .reset_index(name="Count")
-            .sort_values("Count", ascending=False)
-        )
-
-        fig = px.bar(
-            agg_df,
-            x=col,
-            y="Count",
-            color="Accident_Severity",
-            title=f"Accident Severity by {col.replace('_', ' ')}",
-            color_discrete_map=severity_colors_map,
-            category_orders={"Accident_Severity": severity_order},
-            barmode="group"
-        )
-
-        # Force bars to use fully solid fill (no shading or transparency)
-        fig.for_each_trace(lambda t: t.update(marker=dict(line=dict(width=0), opacity=1.0)))
-
-        # Remove the default Plotly gradient shading
-        fig.update_traces(marker_coloraxis=None)
-
-        # Force consistent flat color rendering
-        fig.update_layout(
-            template=None,  # remove plotly's default style template
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            bargap=0.25,
-        )
+        fig = severity_bars(col)
 
         if j == 0:
             with col1:
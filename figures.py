@@ -0,0 +1,221 @@
+import contextlib
+import glob
+import hashlib
+import io
+import os
+from concurrent.futures import BrokenExecutor
+
+import streamlit as st
+
+from cache import LRUCache
+from datasource import dataset_version
+from filters import filter_hash
+from pools import spawn_pool
+
+# Memory budget for rendered chart PNGs, in MiB.
+FIGURE_CACHE_MB = int(os.environ.get("SV25_FIGURE_CACHE_MB", "64"))
+# Optional directory for a second, on-disk tier that survives restarts.
+FIGURE_CACHE_DIR = os.environ.get("SV25_FIGURE_CACHE_DIR")
+# Least recently used PNGs are deleted once that directory holds more than this, in MiB.
+FIGURE_CACHE_DISK_MB = int(os.environ.get("SV25_FIGURE_CACHE_DISK_MB", "256"))
+# Processes rendering chart misses in parallel; 1 renders inline. Each is a
+# full matplotlib interpreter, started on the first cache miss, so the
+# default stays small whatever the core count; SV25_RENDER_WORKERS overrides it.
+RENDER_WORKERS = int(os.environ.get("SV25_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Matches st.pyplot's savefig defaults so cached images look the same.
+FIGURE_DPI = 200
+# st.image scales anything wider than its maximum content width (1460 px)
+# down and re-encodes it on every call, so cached images are stored at most
+# this wide.
+FIGURE_MAX_WIDTH = 1460
+
+
+class FigureCache:
+    """Rendered chart PNGs in memory, backed by an optional disk directory.
+
+    Disk entries are named after the dataset version as well as the key, so
+    a changed CSV or schema never serves a stale image. The directory is
+    kept under disk_bytes by deleting the least recently read or written
+    PNGs, which also clears out images of older dataset versions.
+    """
+
+    def __init__(self, max_bytes, directory=None, disk_bytes=FIGURE_CACHE_DISK_MB * 2**20, version=None):
+        self.memory = LRUCache(max_bytes)
+        self.directory = directory
+        self.version = version or dataset_version()
+        self.disk_bytes = disk_bytes
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_used = sum(stat.st_size for stat, _ in self._disk_files())
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr((self.version, key)).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, digest + ".png")
+
+    def _disk_files(self):
+        files = []
+        for p in glob.glob(os.path.join(self.directory, "*.png")):
+            with contextlib.suppress(FileNotFoundError):
+                files.append((os.stat(p), p))
+        return files
+
+    def get(self, key):
+        png = self.memory.get(key)
+        if png is None and self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    png = f.read()
+                # Mark it recently used, so pruning keeps it.
+                os.utime(path)
+            except OSError:
+                return None
+            self.memory.put(key, png, len(png))
+        return png
+
+    def put(self, key, png):
+        self.memory.put(key, png, len(png))
+        if self.directory:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+            self._disk_used += len(png)
+            if self._disk_used > self.disk_bytes:
+                self._prune(keep=path)
+
+    def _prune(self, keep):
+        """Delete the least recently used PNGs until the directory fits in disk_bytes."""
+        files = self._disk_files()
+        total = sum(stat.st_size for stat, _ in files)
+        # Another server process may share the directory and prune it too.
+        for stat, p in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.disk_bytes:
+                break
+            if p != keep:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(p)
+                total -= stat.st_size
+        self._disk_used = total
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache(FIGURE_CACHE_MB * 2**20, FIGURE_CACHE_DIR)
+
+
+@st.cache_resource(show_spinner=False)
+def get_render_pool():
+    if RENDER_WORKERS <= 1:
+        return None
+    # Spawned workers share no pyplot, font or Streamlit thread state with
+    # the server process.
+    pool = spawn_pool(RENDER_WORKERS)
+    return pool
+
+
+def render_png(draw, title, xlabel, ylabel, rotation=False, figsize=(12, 7), theme="whitegrid", **kwargs):
+    """Draw one chart with draw(ax, **kwargs) and return it as PNG bytes.
+
+    Uses a standalone Figure rather than pyplot, so nothing here touches
+    global figure state and charts can render concurrently. draw and kwargs
+    must be picklable to render in the process pool.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    with sns.axes_style(theme):
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
+    draw(ax, **kwargs)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    if rotation:
+        ax.tick_params(axis="x", labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment("right")
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=FIGURE_DPI, bbox_inches="tight")
+    return _fit_width(buffer.getvalue(), FIGURE_MAX_WIDTH)
+
+
+def _fit_width(png, max_width):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png))
+    if image.width <= max_width:
+        return png
+    height = int(image.height * max_width / image.width)
+    buffer = io.BytesIO()
+    image.resize((max_width, height), resample=Image.BILINEAR).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FigureBatch:
+    """The charts of one page run, rendered in parallel and shown in page order.
+
+    show() puts a cached chart on the page at once. A miss gets a placeholder
+    and is submitted to the render pool; flush() fills the placeholders in
+    page order as their PNGs come back.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.inline = False
+        self.pending = []
+
+    def show(self, chart_id, key, draw, title, xlabel, ylabel, rotation=False,
+             figsize=(12, 7), theme="whitegrid", **kwargs):
+        """Display a chart, rendering it only if (chart, filters, theme, size) is not cached.
+
+        chart_id must identify everything about the chart except the filter
+        state: the same id under the same filter key is assumed to look the same.
+        """
+        cache = get_figure_cache()
+        cache_key = (chart_id, filter_hash(key), theme, tuple(figsize))
+        png = cache.get(cache_key)
+        if png is not None:
+            st.image(png, width="stretch")
+            return
+        args = (draw, title, xlabel, ylabel, rotation, figsize, theme)
+        if self.pool is None and not self.inline:
+            # The pool (and its worker processes) starts on the first miss.
+            self.pool = get_render_pool()
+        if self.pool is None:
+            png = render_png(*args, **kwargs)
+            cache.put(cache_key, png)
+            st.image(png, width="stretch")
+            return
+        try:
+            future = self.pool.submit(render_png, *args, **kwargs)
+        except BrokenExecutor:
+            get_render_pool.clear()
+            self.pool, self.inline = None, True
+            return self.show(chart_id, key, draw, title, xlabel, ylabel, rotation, figsize, theme, **kwargs)
+        self.pending.append((st.empty(), cache_key, future, args, kwargs))
+
+    def flush(self):
+        cache = get_figure_cache()
+        for placeholder, cache_key, future, args, kwargs in self.pending:
+            try:
+                png = future.result()
+            except BrokenExecutor:
+                # A worker died: render here and start a fresh pool next run.
+                get_render_pool.clear()
+                png = render_png(*args, **kwargs)
+            cache.put(cache_key, png)
+            placeholder.image(png, width="stretch")
+        self.pending.clear()
+
+
+def show_figure(chart_id, key, draw, title, xlabel, ylabel, rotation=False,
+                figsize=(12, 7), theme="whitegrid", **kwargs):
+    """Display a single chart through the figure cache; see FigureBatch.show."""
+    batch = FigureBatch()
+    batch.show(chart_id, key, draw, title, xlabel, ylabel, rotation, figsize, theme, **kwargs)
+    batch.flush()
+
@@ -0,0 +1,270 @@
+import hashlib
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache import LRUCache
+from dataset import load_data
+
+# (column, sidebar label) for the multiselect filters, in sidebar order.
+CATEGORY_FILTERS = [
+    ("Accident_Severity", "Accident Severity"),
+    ("Weather", "Weather Condition"),
+    ("Time_of_Day", "Time of Day"),
+    ("Road_Type", "Road Type"),
+    ("Biker_Alcohol", "Biker Alcohol Consumption"),
+    ("Traffic_Density", "Traffic Density"),
+    ("Valid_Driving_License", "Valid Driving License"),
+]
+
+# (column, sidebar label) for the numeric range sliders.
+RANGE_FILTERS = [
+    ("Biker_Age", "Filter by Biker Age"),
+    ("Bike_Speed", "Filter by Bike Speed"),
+    ("Speed_Limit", "Filter by Speed Limit"),
+    ("Riding_Experience", "Filter by Riding Experience"),
+    ("Daily_Travel_Distance", "Filter by Daily Travel Distance"),
+]
+
+# Ranges matching more than 1/DENSE_RANGE_RATIO of the rows are ANDed in as a
+# bitmap instead of being resolved row by row through the sorted index.
+DENSE_RANGE_RATIO = 16
+
+# Memory budget for everything cached per filter state, in MiB: row-id arrays
+# here and the cube slices, sketches, densities and matrices of the other
+# services, which all share get_filter_cache().
+FILTER_CACHE_MB = int(os.environ.get("SV25_FILTER_CACHE_MB", "64"))
+
+
+# --- PACKED BITMAPS ---
+# Bit i of a bitmap is row i. Bitmaps are stored as uint64 words so an
+# AND/OR touches 64 rows per operation.
+def pack_mask(mask):
+    packed = np.packbits(mask, bitorder="little")
+    pad = -len(packed) % 8
+    if pad:
+        packed = np.concatenate([packed, np.zeros(pad, dtype=np.uint8)])
+    return packed.view(np.uint64)
+
+
+def unpack_rows(words, n):
+    """Row positions whose bit is set, in ascending order."""
+    bits = np.unpackbits(words.view(np.uint8), count=n, bitorder="little")
+    return np.flatnonzero(bits)
+
+
+class BitmapIndex:
+    """One packed bitmap per distinct value of a column."""
+
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series, sort=True)
+        self.n = len(series)
+        self.values = np.asarray(uniques).tolist()
+        self.bitmaps = {value: pack_mask(codes == i) for i, value in enumerate(self.values)}
+
+    def lookup(self, selected):
+        """OR together the bitmaps of the selected values."""
+        words = np.zeros((self.n + 63) // 64, dtype=np.uint64)
+        for value in selected:
+            bitmap = self.bitmaps.get(value)
+            if bitmap is not None:
+                np.bitwise_or(words, bitmap, out=words)
+        return words
+
+
+class SortedIndex:
+    """Sorted permutation of a numeric column for O(log n + k) range lookups."""
+
+    def __init__(self, series):
+        values = series.to_numpy()
+        self.values = values
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+        # NaNs sort to the end and never fall inside a range.
+        self.valid = len(self.sorted) - int(pd.isna(self.sorted).sum())
+        self.min = self.sorted[0] if self.valid else None
+        self.max = self.sorted[self.valid - 1] if self.valid else None
+
+    def covers(self, low, high):
+        """True when [low, high] keeps every non-missing row."""
+        return self.valid == 0 or (low <= self.min and high >= self.max)
+
+    def count(self, low, high):
+        start, stop = self._bounds(low, high)
+        return stop - start
+
+    def lookup(self, low, high):
+        """Row positions with low <= value <= high, in value order."""
+        start, stop = self._bounds(low, high)
+        return self.order[start:stop]
+
+    def _bounds(self, low, high):
+        keys = self.sorted[: self.valid]
+        return _search(keys, low, "left"), _search(keys, high, "right")
+
+
+def _search(keys, value, side):
+    # Search with a scalar of the key dtype: a wider scalar makes numpy cast
+    # the whole column first, turning the O(log n) lookup into O(n).
+    if np.issubdtype(keys.dtype, np.integer):
+        info = np.iinfo(keys.dtype)
+        value = math.ceil(value) if side == "left" else math.floor(value)
+        if value < info.min:
+            return 0
+        if value > info.max:
+            return len(keys)
+    return int(np.searchsorted(keys, keys.dtype.type(value), side=side))
+
+
+def in_row_order(rows):
+    # Ties in a stable argsort keep row order, so a range lookup is a few
+    # already-sorted runs that timsort merges in near-linear time.
+    return np.sort(rows, kind="stable")
+
+
+def bits_set(words, rows):
+    """Whether each row's bit is set in a packed bitmap."""
+    return ((words[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+class FilterEngine:
+    """Answers sidebar selections with bitmap AND/OR instead of chained masks."""
+
+    def __init__(self, df, cache=None):
+        self.n = len(df)
+        self.cache = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+        self.indexes = {
+            col: BitmapIndex(df[col]) for col, _ in CATEGORY_FILTERS if col in df.columns
+        }
+        self.ranges = {
+            col: SortedIndex(df[col]) for col, _ in RANGE_FILTERS if col in df.columns
+        }
+
+    def options(self, col):
+        return self.indexes[col].values
+
+    def canonical(self, selections, ranges=None):
+        """Order-independent key for a filter state; () means nothing is filtered out."""
+        parts = []
+        for col, selected in selections.items():
+            index = self.indexes.get(col)
+            # An empty selection means "no filter", like the original pages.
+            if index is None or not selected or set(index.values) <= set(selected):
+                continue
+            parts.append((col, tuple(sorted(set(selected)))))
+        for col, (low, high) in (ranges or {}).items():
+            index = self.ranges.get(col)
+            if index is None or index.covers(low, high):
+                continue
+            parts.append((col, (low, high)))
+        return tuple(sorted(parts))
+
+    def row_ids(self, selections, ranges=None):
+        """Sorted row positions matching every filter, or None if nothing is filtered out."""
+        return self.rows_for_key(self.canonical(selections, ranges))
+
+    def rows_for_key(self, key):
+        if not key:
+            return None
+        rows = self.cache.get(("rows", key))
+        if rows is None:
+            rows = self._compute(key)
+            if self.n < 2**31:
+                rows = rows.astype(np.int32)
+            rows.flags.writeable = False
+            self.cache.put(("rows", key), rows, rows.nbytes)
+        return rows
+
+    def _compute(self, key):
+        words = None
+        sparse = []
+        for col, value in key:
+            if col in self.indexes:
+                bitmap = self.indexes[col].lookup(value)
+                words = bitmap if words is None else np.bitwise_and(words, bitmap, out=words)
+                continue
+            # Narrow ranges resolve through the sorted index in O(log n + k).
+            # A range keeping most rows is cheaper as one more bitmap AND than
+            # as a gather + sort over millions of candidates.
+            index = self.ranges[col]
+            low, high = value
+            count = index.count(low, high)
+            if count * DENSE_RANGE_RATIO <= self.n:
+                sparse.append((count, index, low, high))
+                continue
+            values = index.values
+            bitmap = pack_mask((values >= low) & (values <= high))
+            words = bitmap if words is None else np.bitwise_and(words, bitmap, out=words)
+        if not sparse:
+            return unpack_rows(words, self.n)
+
+        # Start from the narrowest range and check the other filters only on
+        # its k candidate rows.
+        sparse.sort(key=lambda item: item[0])
+        _, index, low, high = sparse[0]
+        rows = index.lookup(low, high)
+        for _, index, low, high in sparse[1:]:
+            values = index.values[rows]
+            rows = rows[(values >= low) & (values <= high)]
+        if words is not None:
+            rows = rows[bits_set(words, rows)]
+        return in_row_order(rows)
+
+    def apply(self, df, selections, ranges=None):
+        rows = self.row_ids(selections, ranges)
+        return df if rows is None else df.take(rows)
+
+
+def filter_hash(key):
+    """Short stable digest of a canonical filter key, for cache keys and file names."""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+@st.cache_resource(show_spinner=False)
+def get_filter_cache():
+    """The one LRU cache, FILTER_CACHE_MB in all, of every service's per-filter-state results.
+
+    Each service prefixes its keys with its own name.
+    """
+    return LRUCache(FILTER_CACHE_MB * 2**20)
+
+
+@st.cache_resource(show_spinner=False)
+def get_filter_engine():
+    return FilterEngine(load_data(), get_filter_cache())
+
+
+# --- SIDEBAR WIDGETS ---
+def sidebar_filters(df):
+    """Render the sidebar filter widgets and return the matching rows of df."""
+    engine = get_filter_engine()
+
+    # --- Multi-select Filters ---
+    selections = {}
+    for col, label in CATEGORY_FILTERS:
+        if col in engine.indexes:
+            options = engine.options(col)
+            selections[col] = st.multiselect(label, options=options, default=options)
+
+    # --- Numeric Range Filters ---
+    ranges = {}
+    for col, label in RANGE_FILTERS:
+        if col in engine.ranges:
+            index = engine.ranges[col]
+            cast = int if np.issubdtype(index.values.dtype, np.integer) else float
+            low, high = cast(index.min), cast(index.max)
+            ranges[col] = st.slider(label, low, high, (low, high))
+
+    # --- Apply Filters ---
+    key = engine.canonical(selections, ranges)
+    st.session_state["filter_key"] = key
+    rows = engine.rows_for_key(key)
+    return df if rows is None else df.take(rows)
+
+
+def current_filter_key():
+    """Canonical key of the filters applied by the last sidebar_filters() call."""
+    return st.session_state.get("filter_key", ())
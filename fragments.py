@@ -0,0 +1,40 @@
+import functools
+import os
+import pickle
+
+import streamlit as st
+
+from cache import LRUCache
+from filters import current_filter_key
+
+# Memory budget for memoised chart outputs (figures, metric values), in MiB.
+FRAGMENT_CACHE_MB = int(os.environ.get("SV25_FRAGMENT_CACHE_MB", "64"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_fragment_cache():
+    return LRUCache(FRAGMENT_CACHE_MB * 2**20)
+
+
+def chart_fragment(chart_id):
+    """Memoise a chart builder per filter state and arguments.
+
+    The page script still reruns on every sidebar change; a decorated
+    builder returns the figure (or value) it built for the same filter
+    state before instead of building it again. The builder is called as
+    ``build(key, *args)`` with the canonical filter key and must take all
+    filter state from it.
+    """
+    def decorate(build):
+        @functools.wraps(build)
+        def run(*args):
+            cache = get_fragment_cache()
+            key = current_filter_key()
+            cache_key = (chart_id, key, args)
+            value = cache.get(cache_key)
+            if value is None:
+                value = build(key, *args)
+                cache.put(cache_key, value, len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+            return value
+        return run
+    return decorate
@@ -0,0 +1,108 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from cache import LRUCache
+from dataset import load_data
+from filters import get_filter_engine
+
+HISTOGRAM_COLUMNS = ["Biker_Age", "Bike_Speed", "Riding_Experience", "Daily_Travel_Distance"]
+
+BINNING_METHODS = {
+    "Fixed": "fixed",
+    "Freedman–Diaconis": "fd",
+    "Quantile": "quantile",
+}
+
+
+def compute_edges(values, method="fixed", bins=20):
+    """Bin edges for one column: equal width, Freedman–Diaconis or equal count."""
+    values = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    if method == "fixed":
+        return np.histogram_bin_edges(values, bins=bins)
+    if method == "fd":
+        return np.histogram_bin_edges(values, bins="fd")
+    if method == "quantile":
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+        return edges if len(edges) > 1 else np.array([edges[0], edges[0] + 1.0])
+    raise ValueError(f"unknown binning method: {method!r}")
+
+
+class HistogramService:
+    """Bins numeric columns on the server so charts only receive bin counts.
+
+    Edges are computed once per (column, method, bins) from the full dataset,
+    so bars stay put as filters change, and each row's bin is stored as a
+    small integer code. Counting a filtered slice is then one bincount over
+    the slice's codes.
+    """
+
+    def __init__(self, df, columns=HISTOGRAM_COLUMNS, cache_bytes=16 * 2**20):
+        self.values = {
+            col: df[col].to_numpy(dtype="float64") for col in columns if col in df.columns
+        }
+        self._binned = {}
+        self._counts = LRUCache(cache_bytes)
+
+    def edges(self, col, method="fixed", bins=20):
+        return self._binning(col, method, bins)[0]
+
+    def _binning(self, col, method, bins):
+        spec = (col, method, bins)
+        binned = self._binned.get(spec)
+        if binned is None:
+            values = self.values[col]
+            edges = compute_edges(values, method, bins)
+            # Right-closed last bin, like np.histogram; NaNs go past the end.
+            codes = np.searchsorted(edges, values, side="right") - 1
+            codes[values == edges[-1]] = len(edges) - 2
+            codes[(codes < 0) | (codes > len(edges) - 2) | np.isnan(values)] = len(edges) - 1
+            code_type = np.uint8 if len(edges) < 256 else np.uint16
+            binned = self._binned.setdefault(spec, (edges, codes.astype(code_type)))
+        return binned
+
+    def counts(self, col, rows=None, method="fixed", bins=20, key=None):
+        """(edges, counts) for the rows of a filter state; rows=None is every row."""
+        cache_key = (col, method, bins, key)
+        if key is not None:
+            cached = self._counts.get(cache_key)
+            if cached is not None:
+                return cached
+        edges, codes = self._binning(col, method, bins)
+        picked = codes if rows is None else codes[rows]
+        counts = np.bincount(picked, minlength=len(edges))[: len(edges) - 1]
+        result = (edges, counts)
+        if key is not None:
+            self._counts.put(cache_key, result, counts.nbytes + edges.nbytes)
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_histogram_service():
+    return HistogramService(load_data())
+
+
+def histogram_chart(key, col, title, method="fixed", bins=20, color_discrete_sequence=None):
+    """Plotly bar chart of a server-binned histogram for a canonical filter key."""
+    rows = get_filter_engine().rows_for_key(key)
+    edges, counts = get_histogram_service().counts(col, rows, method, bins, key=key)
+    widths = np.diff(edges)
+    # Unequal (quantile) bins are drawn as density so bar area stays honest.
+    uniform = np.allclose(widths, widths[0])
+    heights = counts if uniform else counts / widths
+    fig = px.bar(
+        x=edges[:-1] + widths / 2,
+        y=heights,
+        title=title,
+        labels={"x": col, "y": "count" if uniform else "count per unit"},
+        color_discrete_sequence=color_discrete_sequence,
+    )
+    fig.update_traces(
+        width=widths,
+        customdata=np.column_stack([edges[:-1], edges[1:], counts]),
+        hovertemplate="%{customdata[0]:.4g} – %{customdata[1]:.4g}<br>count=%{customdata[2]}<extra></extra>",
+    )
+    fig.update_layout(bargap=0)
+    return fig
@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from dataset import load_data
+from filters import current_filter_key, sidebar_filters
+from histogram import BINNING_METHODS, histogram_chart
+from fragments import chart_fragment
+from export import EXPORT_FORMATS, download_button, export_status
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -9,12 +13,6 @@ st.set_page_config(page_title="Motorbike Accident Insights Dashboard", page_icon
 
 
 # --- LOAD DATA ---
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/aichie-IT/SV25/refs/heads/main/motor_accident.csv"
-    df = pd.read_csv(url)
-    return df
-
 df = load_data()
 
 # ====== SIDEBAR ======
@@ -67,93 +65,10 @@ with st.sidebar:
     with st.expander("Filter Options", expanded=True):
         st.markdown("Select filters to refine your dashboard view:")
 
-        # --- Multi-select Filters ---
-        severity = st.multiselect(
-            "Accident Severity",
-            options=sorted(df["Accident_Severity"].dropna().unique()),
-            default=sorted(df["Accident_Severity"].dropna().unique())
-        )
-
-        weather = st.multiselect(
-            "Weather Condition",
-            options=sorted(df["Weather"].dropna().unique()),
-            default=sorted(df["Weather"].dropna().unique())
-        )
-
-        time_of_day = st.multiselect(
-            "Time of Day",
-            options=sorted(df["Time_of_Day"].dropna().unique()),
-            default=sorted(df["Time_of_Day"].dropna().unique())
-        )
-
-        road_type = st.multiselect(
-            "Road Type",
-            options=sorted(df["Road_Type"].dropna().unique()),
-            default=sorted(df["Road_Type"].dropna().unique())
-        )
-
-        # --- Optional Filters ---
-        if "Biker_Alcohol" in df.columns:
-            alcohol = st.multiselect(
-                "Biker Alcohol Consumption",
-                options=sorted(df["Biker_Alcohol"].dropna().unique()),
-                default=sorted(df["Biker_Alcohol"].dropna().unique())
-            )
-        else:
-            alcohol = []
-
-        if "Traffic_Density" in df.columns:
-            traffic = st.multiselect(
-                "Traffic Density",
-                options=sorted(df["Traffic_Density"].dropna().unique()),
-                default=sorted(df["Traffic_Density"].dropna().unique())
-            )
-        else:
-            traffic = []
-
-        if "Valid_Driving_License" in df.columns:
-            license_status = st.multiselect(
-                "Valid Driving License",
-                options=sorted(df["Valid_Driving_License"].dropna().unique()),
-                default=sorted(df["Valid_Driving_License"].dropna().unique())
-            )
-        else:
-            license_status = []
-
-        # --- Numeric Filter: Biker Age ---
-        if "Biker_Age" in df.columns:
-            min_age, max_age = st.slider(
-                "Filter by Biker Age",
-                int(df["Biker_Age"].min()),
-                int(df["Biker_Age"].max()),
-                (int(df["Biker_Age"].min()), int(df["Biker_Age"].max()))
-            )
-        else:
-            min_age, max_age = None, None
-
-        # --- Apply Filters ---
-        filtered_df = df.copy()
-
-        if severity:
-            filtered_df = filtered_df[filtered_df["Accident_Severity"].isin(severity)]
-        if weather:
-            filtered_df = filtered_df[filtered_df["Weather"].isin(weather)]
-        if time_of_day:
-            filtered_df = filtered_df[filtered_df["Time_of_Day"].isin(time_of_day)]
-        if road_type:
-            filtered_df = filtered_df[filtered_df["Road_Type"].isin(road_type)]
-        if alcohol:
-            filtered_df = filtered_df[filtered_df["Biker_Alcohol"].isin(alcohol)]
-        if traffic:
-            filtered_df = filtered_df[filtered_df["Traffic_Density"].isin(traffic)]
-        if license_status:
-            filtered_df = filtered_df[filtered_df["Valid_Driving_License"].isin(license_status)]
-        if min_age is not None:
-            filtered_df = filtered_df[
-                (filtered_df["Biker_Age"] >= min_age) & (filtered_df["Biker_Age"] <= max_age)
-            ]
+        filtered_df = sidebar_filters(df)
 
     # --- Reset and Download Buttons ---
+    export_format = st.selectbox("Download Format", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Reset Filters"):
@@ -162,12 +77,8 @@ with st.sidebar:
             st.rerun()
 
     with col2:
-        st.download_button(
-            label="Download CSV",
-            data=filtered_df.to_csv(index=False).encode("utf-8"),
-            file_name="motor_accident_data.csv",
-            mime="text/csv"
-        )
+        download_button(current_filter_key(), export_format)
+    export_status()
     st.markdown("---")
     
 # ===== THEME TOGGLE =====
@@ -209,48 +120,44 @@ correlates with fewer severe outcomes.
 """)
 st.markdown("---")
 
-col1, col2 = st.columns(2)
-with col1:
-    fig6 = px.histogram(
-        filtered_df, x="Biker_Age", nbins=20,
-        title="Distribution of Biker Age",
-        color_discrete_sequence=color_theme
-    )
-    st.plotly_chart(fig6, use_container_width=True)
-    st.success("""
-    **Interpretation:** Most bikers are aged between 20–40, which corresponds to moderate accident severity, possibly due to higher riding activity.
-    """)
+# Histograms are binned on the server; only bin counts reach the browser.
+# The binning radio sits in a fragment, so changing it reruns only the histograms.
+@chart_fragment("histogram")
+def histogram(key, col, title, method):
+    return histogram_chart(key, col, title, method=method, color_discrete_sequence=color_theme)
 
-    fig7 = px.histogram(
-        filtered_df, x="Bike_Speed", nbins=20,
-        title="Distribution of Bike Speed",
-        color_discrete_sequence=color_theme
-    )
-    st.plotly_chart(fig7, use_container_width=True)
-    st.success("""
-    **Interpretation:** Speed distribution skews toward 60–80 km/h, and riders above this range tend to experience more severe accidents.
-    """)
+@st.fragment
+def histograms():
+    binning = BINNING_METHODS[st.radio("Histogram Binning", list(BINNING_METHODS), horizontal=True)]
 
-with col2:
-    fig8 = px.histogram(
-        filtered_df, x="Riding_Experience", nbins=20,
-        title="Distribution of Riding Experience",
-        color_discrete_sequence=color_theme
-    )
-    st.plotly_chart(fig8, use_container_width=True)
-    st.success("""
-    **Interpretation:** Greater riding experience is associated with fewer accidents, highlighting the protective role of skill and familiarity.
-    """)
+    col1, col2 = st.columns(2)
+    with col1:
+        fig6 = histogram("Biker_Age", "Distribution of Biker Age", binning)
+        st.plotly_chart(fig6, use_container_width=True)
+        st.success("""
+        **Interpretation:** Most bikers are aged between 20–40, which corresponds to moderate accident severity, possibly due to higher riding activity.
+        """)
+
+        fig7 = histogram("Bike_Speed", "Distribution of Bike Speed", binning)
+        st.plotly_chart(fig7, use_container_width=True)
+        st.success("""
+        **Interpretation:** Speed distribution skews toward 60–80 km/h, and riders above this range tend to experience more severe accidents.
+        """)
 
-    fig9 = px.histogram(
-        filtered_df, x="Daily_Travel_Distance", nbins=20,
-        title="Distribution of Daily Travel Distance",
-        color_discrete_sequence=color_theme
-    )
-    st.plotly_chart(fig9, use_container_width=True)
-    st.success("""
-    **Interpretation:** Moderate daily travel distances (10–30 km) dominate the dataset, while excessive distance relates to fatigue and higher risk.
-    """)
+    with col2:
+        fig8 = histogram("Riding_Experience", "Distribution of Riding Experience", binning)
+        st.plotly_chart(fig8, use_container_width=True)
+        st.success("""
+        **Interpretation:** Greater riding experience is associated with fewer accidents, highlighting the protective role of skill and familiarity.
+        """)
+
+        fig9 = histogram("Daily_Travel_Distance", "Distribution of Daily Travel Distance", binning)
+        st.plotly_chart(fig9, use_container_width=True)
+        st.success("""
+        **Interpretation:** Moderate daily travel distances (10–30 km) dominate the dataset, while excessive distance relates to fatigue and higher risk.
+        """)
+
+histograms()
 st.markdown("#### 💬 Observation")
 st.info("""
 Riders with greater experience tend to maintain safer speeds. The histogram peaks for moderate 
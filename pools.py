@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+# spawn_pool swaps sys.modules["__main__"]; one swap at a time.
+_main_lock = threading.Lock()
+
+
+def spawn_pool(workers, initializer=None, initargs=()):
+    """A spawn-context ProcessPoolExecutor with every worker already started.
+
+    A spawned child re-imports __main__, which under Streamlit is the page
+    script itself: it would run the whole page, or fail if the script cannot
+    be imported. The workers are started here with a bare __main__ instead,
+    and the pool never starts more later.
+
+    Streamlit's script runner also assigns __main__ at the start of every
+    run, so a swap here can overlap another session's run. warmup.py
+    starts the dashboard's pools before the server takes sessions; a pool
+    first started (or restarted) from a session is the fallback.
+    """
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=initializer, initargs=initargs)
+    with _main_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            started = [pool.submit(os.getpid) for _ in range(workers)]
+        finally:
+            sys.modules["__main__"] = main
+    for future in started:
+        future.result()
+    return pool
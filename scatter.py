@@ -0,0 +1,193 @@
+import os
+
+import numpy as np
+import streamlit as st
+
+from cache import LRUCache
+from cube import category_codes
+from dataset import load_data
+from filters import FILTER_CACHE_MB, get_filter_cache, get_filter_engine
+
+SCATTER_COLUMNS = ["Bike_Speed", "Speed_Limit", "Biker_Age", "Riding_Experience", "Daily_Travel_Distance"]
+SCATTER_GROUPS = ["Accident_Severity"]
+
+# Filtered row counts up to this are drawn as points; above it the scatter is
+# rasterized onto a 2D grid, so drawing cost no longer grows with rows.
+SCATTER_POINT_LIMIT = int(os.environ.get("SV25_SCATTER_POINTS", "20000"))
+# Most grid cells per axis. Evenly spaced values (ages, speeds) get one cell
+# per value when they fit, so the raster does not alias.
+SCATTER_BINS = int(os.environ.get("SV25_SCATTER_BINS", "200"))
+# Rows drawn as points over the raster, split evenly across hue groups so
+# rare severities stay visible; 0 draws the raster alone.
+SCATTER_SAMPLE = int(os.environ.get("SV25_SCATTER_SAMPLE", "0"))
+
+
+def _axis_bins(values, size):
+    """(cell edges, cell codes) of one column's fixed grid; NaN gets code -1."""
+    finite = values[~np.isnan(values)]
+    distinct = np.unique(finite)
+    lo, hi = distinct[0], distinct[-1]
+    # The typical gap between distinct values; a stray half value in a column
+    # of whole numbers must not halve the cells and leave every other one empty.
+    step = np.median(np.diff(distinct)) if len(distinct) > 1 else 1.0
+    if (hi - lo) / step < size:
+        edges = lo - step / 2 + step * np.arange(int(round((hi - lo) / step)) + 2)
+    else:
+        edges = np.linspace(lo, hi if hi > lo else lo + 1, size + 1)
+    codes = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+    codes[np.isnan(values)] = -1
+    return edges, codes.astype(np.int32)
+
+
+class ScatterService:
+    """Scatter plot layers that stay cheap to draw at any row count.
+
+    Small selections are returned as their rows. Larger ones are counted onto
+    a fixed grid per column pair and hue group with one bincount; the drawing
+    then costs the same whatever the number of rows behind it.
+    """
+
+    def __init__(self, df, columns=SCATTER_COLUMNS, groups=SCATTER_GROUPS,
+                 bins=SCATTER_BINS, cache=None):
+        self.df = df
+        self.bins = {
+            col: _axis_bins(df[col].to_numpy(dtype="float64"), bins)
+            for col in columns if col in df.columns
+        }
+        self.groups = {group: category_codes(df[group]) for group in groups if group in df.columns}
+        self._layers = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+
+    def layer(self, x, y, hue=None, key=(), rows=None, limit=SCATTER_POINT_LIMIT, sample=SCATTER_SAMPLE):
+        """A points or raster layer of y against x; rows=None is every row."""
+        cache_key = ("scatter", x, y, hue, key, limit, sample)
+        cached = self._layers.get(cache_key)
+        if cached is not None:
+            return cached
+        n = len(self.df) if rows is None else len(rows)
+        cols = [x, y] + ([hue] if hue else [])
+        if n <= limit:
+            data = self.df[cols] if rows is None else self.df[cols].take(rows)
+            layer = {"kind": "points", "x": x, "y": y, "hue": hue, "data": data}
+            self._layers.put(cache_key, layer, int(data.memory_usage(deep=True).sum()))
+            return layer
+
+        x_edges, y_edges, labels, counts = self.grid(x, y, hue, key, rows)
+        codes = self.groups[hue][0] if hue else np.zeros(len(self.df), dtype=np.int32)
+        if rows is not None:
+            codes = codes[rows]
+        layer = {
+            "kind": "raster", "x": x, "y": y, "hue": hue, "labels": labels,
+            "x_edges": x_edges, "y_edges": y_edges, "counts": counts,
+            "sample": self._sample(cols, codes, rows, len(labels), sample) if sample else None,
+        }
+        nbytes = counts.nbytes + (0 if layer["sample"] is None else int(layer["sample"].memory_usage().sum()))
+        self._layers.put(cache_key, layer, nbytes)
+        return layer
+
+    def grid(self, x, y, hue=None, key=(), rows=None):
+        """(x edges, y edges, hue labels, row counts shaped (group, y cell, x cell))."""
+        cache_key = ("scatter_grid", x, y, hue, key)
+        cached = self._layers.get(cache_key)
+        if cached is not None:
+            return cached
+        x_edges, x_codes = self.bins[x]
+        y_edges, y_codes = self.bins[y]
+        if hue:
+            codes, labels = self.groups[hue]
+        else:
+            codes, labels = np.zeros(len(self.df), dtype=np.int32), [None]
+        if rows is not None:
+            x_codes, y_codes, codes = x_codes[rows], y_codes[rows], codes[rows]
+        valid = (codes >= 0) & (x_codes >= 0) & (y_codes >= 0)
+        nx, ny = len(x_edges) - 1, len(y_edges) - 1
+        flat = (codes[valid].astype(np.int64) * ny + y_codes[valid]) * nx + x_codes[valid]
+        counts = np.bincount(flat, minlength=len(labels) * ny * nx).astype(np.int32)
+        result = (x_edges, y_edges, list(labels), counts.reshape(len(labels), ny, nx))
+        self._layers.put(cache_key, result, counts.nbytes)
+        return result
+
+    def _sample(self, cols, codes, rows, n_groups, size):
+        """Up to size rows, an equal share from each hue group; the same on every call."""
+        rng = np.random.default_rng(0)
+        ids = np.arange(len(self.df)) if rows is None else rows
+        picked = []
+        for g in range(n_groups):
+            members = ids[codes == g]
+            take = min(len(members), -(-size // n_groups))
+            picked.append(rng.choice(members, take, replace=False))
+        return self.df[cols].take(np.sort(np.concatenate(picked)))
+
+
+@st.cache_resource(show_spinner=False)
+def get_scatter_service():
+    return ScatterService(load_data(), cache=get_filter_cache())
+
+
+def scatter_layer(key, x, y, hue=None):
+    """The layer to draw for y against x under a canonical filter key."""
+    rows = get_filter_engine().rows_for_key(key)
+    return get_scatter_service().layer(x, y, hue, key, rows)
+
+
+def density_grid(key, x, y, facet="Accident_Severity"):
+    """Row counts of the x, y grid per facet group under a canonical filter key."""
+    rows = get_filter_engine().rows_for_key(key)
+    return get_scatter_service().grid(x, y, facet, key, rows)
+
+
+def density_figure(grid, x, y, facet="Accident_Severity"):
+    """Plotly heatmaps of a density_grid, one facet per group side by side.
+
+    Only the cell counts are sent to the browser, however many rows they hold.
+    """
+    import plotly.express as px
+
+    x_edges, y_edges, labels, counts = grid
+    fig = px.imshow(
+        counts, facet_col=0, origin="lower", aspect="auto",
+        x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        labels={"x": x, "y": y, "color": "Rows"}, color_continuous_scale="Viridis",
+        title=f"{y} vs {x} by {facet.replace('_', ' ')}",
+    )
+    for annotation, label in zip(fig.layout.annotations, labels):
+        annotation.text = str(label)
+    return fig
+
+
+def draw_scatter_plot(ax, layer, palette=None, alpha=0.6, legend_title=None):
+    """Scatter plot of a layer from scatter_layer, styled like seaborn.scatterplot.
+
+    A raster cell's colour is its hue groups' colours mixed by their row
+    counts, and its opacity grows with the log of its total count.
+    """
+    import seaborn as sns
+    from matplotlib.lines import Line2D
+
+    x, y, hue = layer["x"], layer["y"], layer["hue"]
+    if layer["kind"] == "points":
+        sns.scatterplot(x=x, y=y, hue=hue, data=layer["data"], palette=palette, alpha=alpha, ax=ax)
+        if legend_title:
+            ax.legend(title=legend_title)
+        return ax
+
+    labels, counts = layer["labels"], layer["counts"]
+    colors = np.array(sns.color_palette(palette, len(labels)) if hue else sns.color_palette()[:1])
+    total = counts.sum(axis=0)
+    filled = total > 0
+    image = np.zeros(total.shape + (4,))
+    image[..., :3] = np.einsum("gij,gc->ijc", counts, colors) / np.maximum(total, 1)[..., None]
+    if filled.any():
+        image[..., 3] = np.where(filled, 0.25 + 0.75 * np.log1p(total) / np.log1p(total.max()), 0)
+    x_edges, y_edges = layer["x_edges"], layer["y_edges"]
+    ax.imshow(image, origin="lower", aspect="auto", interpolation="nearest",
+              extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]))
+    sample = layer["sample"]
+    if sample is not None:
+        for label, color in zip(labels, colors):
+            points = sample if label is None else sample[sample[hue] == label]
+            ax.scatter(points[x], points[y], s=8, color=color, alpha=alpha, edgecolors="white", linewidths=0.3)
+    if hue:
+        handles = [Line2D([], [], marker="o", linestyle="", color=color, label=label)
+                   for label, color in zip(labels, colors)]
+        ax.legend(handles=handles, title=legend_title or hue)
+    return ax
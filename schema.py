@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+SEVERITY_ORDER = ["No Accident", "Moderate Accident", "Severe Accident"]
+
+# --- DECLARED SCHEMA ---
+# "category" columns keep their values in sorted order so category codes line
+# up with the sorted options shown in the sidebar.
+SCHEMA = {
+    "Biker_Age": "int8",
+    "Biker_Occupation": "category",
+    "Biker_Education_Level": "category",
+    "Riding_Experience": "float32",
+    "Daily_Travel_Distance": "float32",
+    "Talk_While_Riding": "category",
+    "Smoke_While_Riding": "category",
+    "Wearing_Helmet": "category",
+    "Motorcycle_Ownership": "category",
+    "Valid_Driving_License": "category",
+    "Bike_Condition": "category",
+    "Road_Type": "category",
+    "Road_condition": "category",
+    "Weather": "category",
+    "Time_of_Day": "category",
+    "Traffic_Density": "int8",
+    "Speed_Limit": "int16",
+    "Bike_Speed": "int16",
+    "Number_of_Vehicles": "int8",
+    "Biker_Alcohol": "int8",
+    "Accident_Severity": pd.CategoricalDtype(SEVERITY_ORDER, ordered=True),
+}
+
+
+def _to_int(series, dtype):
+    # Fall back to float32 when a declared integer column has gaps, fractions
+    # or values outside the integer range instead of silently corrupting them.
+    info = np.iinfo(dtype)
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    finite = values[~np.isnan(values)]
+    if (
+        len(finite) != len(values)
+        or (finite % 1 != 0).any()
+        or (len(finite) and (finite.min() < info.min or finite.max() > info.max))
+    ):
+        return series.astype("float32")
+    return series.astype(dtype)
+
+
+def apply_schema(df):
+    """Return df with the declared compact dtypes applied to known columns."""
+    typed = {}
+    for col in df.columns:
+        dtype = SCHEMA.get(col)
+        series = df[col]
+        if dtype is None or series.dtype == dtype:
+            typed[col] = series
+        elif isinstance(dtype, pd.CategoricalDtype) or dtype.startswith("float"):
+            typed[col] = series.astype(dtype)
+        elif dtype == "category":
+            typed[col] = series.astype(pd.CategoricalDtype(sorted(series.dropna().unique())))
+        else:
+            typed[col] = _to_int(series, dtype)
+    return pd.DataFrame(typed, index=df.index)
+
+
+def memory_report(raw, typed):
+    """Per-column bytes per row before and after applying the schema."""
+    rows = max(len(raw), 1)
+    report = pd.DataFrame({
+        "raw_dtype": raw.dtypes.astype(str),
+        "raw_bytes_per_row": raw.memory_usage(deep=True, index=False) / rows,
+        "typed_dtype": typed.dtypes.astype(str),
+        "typed_bytes_per_row": typed.memory_usage(deep=True, index=False) / rows,
+    })
+    report.loc["TOTAL"] = [
+        "", report["raw_bytes_per_row"].sum(), "", report["typed_bytes_per_row"].sum(),
+    ]
+    return report
@@ -0,0 +1,194 @@
+import os
+
+import numpy as np
+import streamlit as st
+
+from cache import LRUCache
+from cube import FilterCells, category_codes, get_filter_cells
+from dataset import load_data
+from filters import FILTER_CACHE_MB, get_filter_cache, get_filter_engine
+
+SKETCH_COLUMNS = ["Biker_Age", "Riding_Experience", "Daily_Travel_Distance", "Bike_Speed", "Speed_Limit"]
+SKETCH_GROUPS = ["Accident_Severity", "Biker_Occupation", "Weather"]
+
+# Buckets per column sketch. Columns with no more distinct values than this get
+# one bucket per value and are exact; see `python benchmark.py sketches`.
+SKETCH_SIZE = int(os.environ.get("SV25_SKETCH_SIZE", "128"))
+
+
+class QuantileSketch:
+    """Fixed-bucket quantile sketch over one numeric column.
+
+    Every sketch of a column shares the same buckets, so merging two sketches
+    is adding their counts. With ``exact`` the buckets are the column's
+    distinct values (``points``); otherwise ``points`` are the edges of
+    equal-width buckets and rows are assumed evenly spread inside each one.
+    """
+
+    def __init__(self, points, counts, exact):
+        self.points = points
+        self.counts = counts
+        self.exact = exact
+        self.n = int(counts.sum())
+
+    def merge(self, other):
+        return QuantileSketch(self.points, self.counts + other.counts, self.exact)
+
+    def _value_at_rank(self, rank):
+        cum = np.cumsum(self.counts)
+        bucket = np.searchsorted(cum, rank, side="right")
+        if self.exact:
+            return self.points[bucket]
+        start = cum[bucket] - self.counts[bucket]
+        offset = (rank - start + 0.5) / self.counts[bucket]
+        return self.points[bucket] + offset * (self.points[bucket + 1] - self.points[bucket])
+
+    def quantile(self, q):
+        """Linearly interpolated quantile, like np.percentile's default."""
+        position = np.asarray(q, dtype="float64") * (self.n - 1)
+        below = self._value_at_rank(np.floor(position))
+        above = self._value_at_rank(np.ceil(position))
+        return below + (above - below) * (position - np.floor(position))
+
+    def box_stats(self, label, whis=1.5):
+        """Summary statistics in the format matplotlib's Axes.bxp expects."""
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        # One representative value per non-empty bucket.
+        buckets = np.flatnonzero(self.counts)
+        if self.exact:
+            values = self.points[buckets]
+        else:
+            values = (self.points[buckets] + self.points[buckets + 1]) / 2
+        inside = values[(values >= low) & (values <= high)]
+        return {
+            "label": label,
+            "q1": q1,
+            "med": med,
+            "q3": q3,
+            "whislo": inside.min() if len(inside) else q1,
+            "whishi": inside.max() if len(inside) else q3,
+            "fliers": values[(values < low) | (values > high)],
+            "mean": float((values * self.counts[buckets]).sum() / self.n),
+        }
+
+
+def _bucketize(values, size):
+    """(points, exact, bucket codes) for one column; NaN gets code len(buckets)."""
+    finite = values[~np.isnan(values)]
+    distinct = np.unique(finite)
+    if len(distinct) <= size:
+        # Few distinct values (ages, speeds, limits): one bucket each, exact.
+        points, exact, n_buckets = distinct, True, len(distinct)
+        codes = np.searchsorted(distinct, values)
+    else:
+        points, exact, n_buckets = np.linspace(distinct[0], distinct[-1], size + 1), False, size
+        codes = np.clip(np.searchsorted(points, values, side="right") - 1, 0, size - 1)
+    codes[np.isnan(values)] = n_buckets
+    return points, exact, codes.astype(np.uint16)
+
+
+class SketchStore:
+    """Per (filter cell, group) quantile sketches of the numeric columns.
+
+    A filter cell is one combination of the sidebar multiselect values, so
+    the sketch for any categorical filter state is the merge (sum) of its
+    cells. Cell counts are built on first use of a (column, group) pair and
+    kept; filter states with a numeric range are sketched from their row ids.
+    """
+
+    def __init__(self, df, columns=SKETCH_COLUMNS, groups=SKETCH_GROUPS, size=SKETCH_SIZE, cells=None, cache=None):
+        self.cells = FilterCells(df) if cells is None else cells
+        self.groups = {group: category_codes(df[group]) for group in groups if group in df.columns}
+        self.buckets = {
+            col: _bucketize(df[col].to_numpy(dtype="float64"), size)
+            for col in columns if col in df.columns
+        }
+        self._counts = {}
+        self._slices = LRUCache(FILTER_CACHE_MB * 2**20) if cache is None else cache
+
+    def cell_counts(self, col, group):
+        """Counts shaped (*filter cells, group, bucket + missing slot)."""
+        counts = self._counts.get((col, group))
+        if counts is None:
+            codes, labels = self.groups[group]
+            points, exact, buckets = self.buckets[col]
+            slots = (len(points) if exact else len(points) - 1) + 1
+            valid = codes >= 0
+            flat = (self.cells.cell[valid].astype(np.int64) * len(labels) + codes[valid]) * slots + buckets[valid]
+            size = self.cells.size * len(labels) * slots
+            counts = np.bincount(flat, minlength=size).astype(np.int32)
+            counts = self._counts.setdefault(
+                (col, group), counts.reshape(self.cells.shape + (len(labels), slots))
+            )
+        return counts
+
+    def sketches(self, col, group, key=(), rows=None):
+        """{group label: QuantileSketch} of col for a canonical filter key."""
+        cached = self._slices.get(("sketch", col, group, key))
+        if cached is not None:
+            return cached
+        codes, labels = self.groups[group]
+        points, exact, buckets = self.buckets[col]
+        n_buckets = len(points) if exact else len(points) - 1
+        if self.cells.covers(key):
+            counts = self.cells.select(self.cell_counts(col, group), key)
+        else:
+            # Numeric ranges are not cell dimensions: count the filtered rows.
+            slots = n_buckets + 1
+            codes, picked = codes[rows], buckets[rows]
+            valid = codes >= 0
+            flat = codes[valid].astype(np.int64) * slots + picked[valid]
+            counts = np.bincount(flat, minlength=len(labels) * slots).reshape(len(labels), slots)
+        result = {
+            label: QuantileSketch(points, counts[i, :n_buckets], exact)
+            for i, label in enumerate(labels)
+        }
+        self._slices.put(("sketch", col, group, key), result, counts.nbytes)
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_sketch_store():
+    return SketchStore(load_data(), cells=get_filter_cells(), cache=get_filter_cache())
+
+
+def box_sketches(key, col, group):
+    """Per-group sketches of col for a canonical filter key."""
+    store = get_sketch_store()
+    rows = None
+    if not store.cells.covers(key):
+        rows = get_filter_engine().rows_for_key(key)
+    return store.sketches(col, group, key, rows)
+
+
+def draw_box_plot(ax, sketches, palette="viridis", whis=1.5):
+    """Box plot of per-group sketches, styled like seaborn.boxplot.
+
+    Every group keeps its tick, so the x axis does not shift as filters
+    empty a group out.
+    """
+    import seaborn as sns
+
+    labels = list(sketches)
+    colors = [sns.desaturate(color, 0.75) for color in sns.color_palette(palette, len(labels))]
+    stats, positions, faces = [], [], []
+    for i, (label, sketch) in enumerate(sketches.items()):
+        if sketch.n:
+            stats.append(sketch.box_stats(label, whis))
+            positions.append(i)
+            faces.append(colors[i])
+    if stats:
+        artists = ax.bxp(
+            stats, positions=positions, widths=0.8, patch_artist=True,
+            medianprops={"color": "0.25"}, whiskerprops={"color": "0.25"},
+            capprops={"color": "0.25"},
+            flierprops={"marker": "o", "markerfacecolor": "none", "markeredgecolor": "0.25", "markersize": 5},
+        )
+        for box, face in zip(artists["boxes"], faces):
+            box.set_facecolor(face)
+            box.set_edgecolor("0.25")
+    ax.set_xticks(range(len(labels)), labels)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    ax.xaxis.grid(False)
+    return ax
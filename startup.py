@@ -0,0 +1,122 @@
+"""Cold-start report for the dashboard pages.
+
+Cold start is a fresh interpreter importing a page's modules and running
+the page once with the default filters, as the first visitor after a
+server start sees it (the dataset snapshot already on disk). The target is
+STARTUP_BUDGET_MS per page; matplotlib and seaborn must stay unloaded
+until the Advanced page (or tab) actually renders a figure.
+
+``python startup.py`` prints, per page, the import time of each top-level
+package (from ``-X importtime``) and the first-run time.
+``python startup.py --check`` exits non-zero when a page misses the budget
+or loads a deferred module; test_startup.py runs the same check under
+pytest.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = ["overview.py", "factors.py", "numerical.py", "advanced.py", "correlation.py", "behavior.py",
+         "home.py", "main.py"]
+# Cold-start target per page, in ms (imports plus the first run).
+STARTUP_BUDGET_MS = int(os.environ.get("SV25_STARTUP_BUDGET_MS", "3000"))
+# Modules no page may load until it renders a matplotlib figure.
+DEFERRED_MODULES = ["matplotlib", "seaborn"]
+
+
+def page_imports(page):
+    """Source of a page's top-level import statements."""
+    with open(os.path.join(BASE_DIR, page)) as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _import_times(source):
+    """{module: cumulative import ms} of the entries -X importtime does not indent."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", source],
+                            cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            times[name.strip()] = times.get(name.strip(), 0) + int(cumulative) / 1000
+    return times
+
+
+def import_profile(page):
+    """{module: cumulative import ms} of a page's own import statements, slowest first."""
+    # Modules the interpreter imports at startup (site, encodings) are not the page's.
+    startup = _import_times("pass")
+    profile = {name: ms for name, ms in _import_times(page_imports(page)).items() if name not in startup}
+    return dict(sorted(profile.items(), key=lambda item: -item[1]))
+
+
+def _first_run(page):
+    """Run in the child: time the page's imports and first run, then report."""
+    import time
+
+    start = time.perf_counter()
+    exec(compile(page_imports(page), page, "exec"), {})
+    imported = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(BASE_DIR, page), default_timeout=600)
+    ran = time.perf_counter()
+    app.run()
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "run_ms": (done - ran) * 1000,
+        "errors": [str(e.value) for e in app.exception],
+        "deferred": [name for name in DEFERRED_MODULES if name in sys.modules],
+    }))
+
+
+def cold_start(page):
+    """Import and first-run times of a page in a fresh interpreter."""
+    result = subprocess.run([sys.executable, __file__, "--child", page],
+                            cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(pages=PAGES, top=5, budget=STARTUP_BUDGET_MS):
+    """Print the startup report and return the list of problems found."""
+    problems = []
+    for page in pages:
+        timing = cold_start(page)
+        total = timing["import_ms"] + timing["run_ms"]
+        print(f"\n{page}: {total:7.0f} ms cold start (imports {timing['import_ms']:.0f} ms, "
+              f"first run {timing['run_ms']:.0f} ms; budget {budget} ms)")
+        if top:
+            for name, ms in list(import_profile(page).items())[:top]:
+                print(f"  import {name:<30} {ms:7.1f} ms")
+        if total > budget:
+            problems.append(f"{page}: cold start {total:.0f} ms over the {budget} ms budget")
+        if timing["deferred"]:
+            problems.append(f"{page}: loads {', '.join(timing['deferred'])} before rendering a figure")
+        problems += [f"{page}: {error}" for error in timing["errors"]]
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a page misses the cold-start target")
+    parser.add_argument("--budget", type=int, default=STARTUP_BUDGET_MS, help="cold-start budget per page, ms")
+    parser.add_argument("--top", type=int, default=5, help="packages to list per page")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _first_run(args.child)
+        sys.exit(0)
+    problems = report(args.pages, args.top, args.budget)
+    for problem in problems:
+        print(f"FAIL {problem}", file=sys.stderr)
+    sys.exit(1 if args.check and problems else 0)
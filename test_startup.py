@@ -0,0 +1,12 @@
+"""Cold-start regression test for every page (see startup.py)."""
+import pytest
+
+from startup import PAGES, STARTUP_BUDGET_MS, report
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_cold_start(page):
+    # Each problem is a page over STARTUP_BUDGET_MS, a deferred module
+    # (matplotlib, seaborn) loaded before a figure, or an exception.
+    problems = report([page], top=0, budget=STARTUP_BUDGET_MS)
+    assert problems == []
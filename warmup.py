@@ -0,0 +1,88 @@
+"""Warm the dashboard's caches before the first visitor arrives.
+
+Every page is run once with the default filters, with all of its tabs and
+chart expanders open, in the current process. That loads the dataset and
+fills the process-wide services (filter indexes, cubes, histograms,
+sketches, correlation and association matrices, behavior metrics) and the
+chart and figure caches, so a visitor's first run costs what a repeat run
+does.
+
+``python warmup.py`` warms a process and reports per-page first and warm
+run times (useful on its own to build the dataset snapshot and, with
+SV25_FIGURE_CACHE_DIR set, the on-disk figure cache).
+``python warmup.py --serve [streamlit options]`` also starts the render
+and export worker pools first, warms, then starts the dashboard server in
+the same process, so the warm caches and running pools serve it.
+"""
+import argparse
+import os
+import sys
+import time
+
+from startup import BASE_DIR, PAGES
+
+# The Advanced page's (and tab's) chart expanders, which render nothing while closed.
+EXPANDERS = ["box_plots", "violin_plots", "scatter_plots", "density_plots"]
+# The server's entry script.
+ENTRY_SCRIPT = "sidebar.py"
+
+
+def _run(page, tab=None):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(BASE_DIR, page), default_timeout=600)
+    for key in EXPANDERS:
+        app.session_state[key] = True
+    if tab is not None:
+        app.session_state["dashboard_tabs"] = tab
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"{page} {tab or ''}: {app.exception[0].value}")
+    return app, elapsed
+
+
+def start_pools():
+    """Start the render and export worker pools while no session script runs (see pools.spawn_pool)."""
+    from export import get_export_queue
+    from figures import get_render_pool
+
+    get_render_pool()
+    get_export_queue()
+
+
+def warm_up(pages=PAGES, verbose=True):
+    """Run every page (and tab) with default filters; return {(page, tab): (cold s, warm s)}."""
+    timings = {}
+    for page in pages:
+        app, cold = _run(page)
+        # main.py and home.py hold all six pages as tabs; only the open one
+        # renders, and the first is open by default.
+        for i, tab in enumerate([tab.label for tab in app.tabs] or [None]):
+            if i > 0:
+                _, cold = _run(page, tab)
+            # A new session after warming: what the first visitor now sees.
+            _, warm = _run(page, tab)
+            timings[page, tab] = (cold, warm)
+            if verbose:
+                print(f"{page} {tab or '':<30} first run {cold * 1000:8.1f} ms   warmed {warm * 1000:8.1f} ms")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--serve", nargs=argparse.REMAINDER,
+                        help="then start the dashboard; further arguments go to streamlit run")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.serve is not None:
+        start_pools()
+    warm_up(args.pages)
+    print(f"warmed in {time.perf_counter() - start:.1f} s")
+    if args.serve is not None:
+        from streamlit.web import cli
+
+        sys.argv = ["streamlit", "run", os.path.join(BASE_DIR, ENTRY_SCRIPT), *args.serve]
+        sys.exit(cli.main())